@@ -0,0 +1,6 @@
+"""
+Shared pipeline helpers
+=======================
+Các module dùng chung cho scripts trong progress/ và web app
+(schema đọc CSV, ...).
+"""
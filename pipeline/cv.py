@@ -0,0 +1,191 @@
+"""
+Parallel Cross-Validation Harness
+=================================
+Chạy K-Fold CV cho nhiều models cùng lúc:
+- Mỗi (model, fold) chỉ fit MỘT lần và tính tất cả scorers (accuracy, f1...)
+  cho cả train và validation, thay vì gọi cross_val_score nhiều lần; các
+  scorer dùng chung một lần predict cho mỗi tập (multimetric scorer của sklearn).
+- Lưới model × fold được chạy song song bằng process pool (joblib/loky).
+- Fold splits được tính một lần, dùng chung cho mọi model và cache ra file .npz.
+- warm_start_curve: validation curve theo số cây, mỗi fold chỉ phát triển một forest.
+
+Kết quả có cùng format với sklearn.model_selection.cross_validate:
+    {'test_accuracy': array, 'train_accuracy': array, 'fit_time': array, ...}
+"""
+
+import hashlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import check_scoring, get_scorer
+from sklearn.model_selection import KFold, StratifiedKFold
+
+
+def _hash_target(y) -> str:
+    """Hash của target để kiểm tra cache fold còn hợp lệ."""
+    return hashlib.sha256(np.ascontiguousarray(np.asarray(y)).tobytes()).hexdigest()
+
+
+def make_folds(y, n_splits: int = 5, stratified: bool = True, cache_path=None) -> list:
+    """
+    Tạo (hoặc load từ cache) danh sách (train_idx, test_idx).
+
+    Mặc định giống cv=5 của sklearn cho classifier: StratifiedKFold không shuffle.
+    Cache bị bỏ qua nếu target, n_splits hoặc stratified thay đổi.
+    """
+    y_hash = _hash_target(y)
+    if cache_path and os.path.exists(cache_path):
+        cached = np.load(cache_path)
+        if (str(cached['y_hash']) == y_hash and int(cached['n_splits']) == n_splits
+                and 'stratified' in cached.files and bool(cached['stratified']) == stratified):
+            return [(cached[f'train_{i}'], cached[f'test_{i}']) for i in range(n_splits)]
+
+    splitter = StratifiedKFold(n_splits=n_splits) if stratified else KFold(n_splits=n_splits)
+    folds = list(splitter.split(np.zeros(len(y)), y))
+
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        arrays = {}
+        for i, (train_idx, test_idx) in enumerate(folds):
+            arrays[f'train_{i}'] = train_idx
+            arrays[f'test_{i}'] = test_idx
+        np.savez(cache_path, y_hash=y_hash, n_splits=n_splits, stratified=stratified, **arrays)
+    return folds
+
+
+def _take(data, idx):
+    return data.iloc[idx] if hasattr(data, 'iloc') else data[idx]
+
+
+def _fit_and_score(model, X, y, train_idx, test_idx, scoring, return_train_score):
+    """Fit một model trên một fold và tính tất cả scorers."""
+    X_train, y_train = _take(X, train_idx), _take(y, train_idx)
+    X_test, y_test = _take(X, test_idx), _take(y, test_idx)
+
+    estimator = clone(model)
+    start = time.perf_counter()
+    estimator.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # Một lần predict cho mỗi tập, dùng chung cho mọi scorer
+    scorer = check_scoring(estimator, scoring=scoring)
+    scores = {f'test_{name}': value for name, value in scorer(estimator, X_test, y_test).items()}
+    if return_train_score:
+        scores.update({f'train_{name}': value for name, value in scorer(estimator, X_train, y_train).items()})
+    scores['score_time'] = time.perf_counter() - start
+    scores['fit_time'] = fit_time
+    return scores
+
+
+def cross_validate_models(models: dict, X, y, scoring=('accuracy', 'f1'), cv: int = 5,
+                          n_jobs: int = -1, return_train_score: bool = True,
+                          cache_path=None) -> dict:
+    """
+    Cross-validate nhiều models song song trên cùng fold splits.
+
+    Args:
+        models: {tên: estimator}
+        X, y: Dữ liệu đầy đủ
+        scoring: Danh sách tên scorer của sklearn
+        cv: Số folds
+        n_jobs: Số process (-1 = tất cả CPU)
+        return_train_score: Tính thêm score trên tập train (phát hiện overfitting)
+        cache_path: File .npz để cache fold splits
+
+    Returns:
+        {tên model: dict kết quả giống cross_validate}
+    """
+    scoring = list(scoring)
+    stratified = all(is_classifier(model) for model in models.values())
+    folds = make_folds(y, n_splits=cv, stratified=stratified, cache_path=cache_path)
+
+    tasks = [(name, train_idx, test_idx)
+             for name in models
+             for train_idx, test_idx in folds]
+    outputs = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_and_score)(models[name], X, y, train_idx, test_idx, scoring, return_train_score)
+        for name, train_idx, test_idx in tasks
+    )
+
+    results = {}
+    for (name, _, _), scores in zip(tasks, outputs):
+        model_result = results.setdefault(name, {})
+        for key, value in scores.items():
+            model_result.setdefault(key, []).append(value)
+    return {
+        name: {key: np.asarray(values) for key, values in model_result.items()}
+        for name, model_result in results.items()
+    }
+
+
+def comparison_table(results: dict, scoring=('accuracy', 'f1')) -> pd.DataFrame:
+    """Bảng so sánh: mean, std, 95% CI (1.96*std) và overfitting gap cho từng metric."""
+    rows = []
+    for name, res in results.items():
+        row = {'model': name}
+        for metric in scoring:
+            test_scores = res[f'test_{metric}']
+            row[f'{metric}_mean'] = test_scores.mean()
+            row[f'{metric}_std'] = test_scores.std()
+            row[f'{metric}_ci95'] = 1.96 * test_scores.std()
+            if f'train_{metric}' in res:
+                row[f'{metric}_gap'] = res[f'train_{metric}'].mean() - test_scores.mean()
+        row['n_fits'] = len(res['fit_time'])
+        row['fit_time_total'] = res['fit_time'].sum()
+        rows.append(row)
+    return pd.DataFrame(rows).set_index('model')
+
+
+def write_comparison_table(results: dict, path: str, scoring=('accuracy', 'f1')) -> pd.DataFrame:
+    """Ghi bảng so sánh ra CSV và trả về DataFrame."""
+    table = comparison_table(results, scoring=scoring)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    table.to_csv(path, float_format='%.4f')
+    return table
+
+
+def _grow_and_score(estimator, X, y, train_idx, test_idx, sizes, param_name, scorer):
+    """Phát triển một forest theo từng mốc số cây (warm_start) và score ở mỗi mốc."""
+    X_train, y_train = _take(X, train_idx), _take(y, train_idx)
+    X_test, y_test = _take(X, test_idx), _take(y, test_idx)
+
+    model = clone(estimator).set_params(warm_start=True)
+    train_scores, test_scores = [], []
+    for size in sizes:
+        model.set_params(**{param_name: size})
+        model.fit(X_train, y_train)  # chỉ train thêm (size - số cây hiện có) cây
+        train_scores.append(scorer(model, X_train, y_train))
+        test_scores.append(scorer(model, X_test, y_test))
+    return train_scores, test_scores
+
+
+def warm_start_curve(estimator, X, y, param_range, param_name: str = 'n_estimators',
+                     cv: int = 5, scoring: str = 'f1', n_jobs: int = -1, cache_path=None):
+    """
+    Thay thế validation_curve cho số cây của ensemble hỗ trợ warm_start.
+
+    Mỗi fold chỉ phát triển MỘT forest đến max(param_range) và ghi score tại
+    từng mốc, nên chi phí ~ max(param_range) cây thay vì sum(param_range) cây.
+    Với cùng random_state, cây thêm vào giống hệt khi fit lại từ đầu.
+
+    Returns:
+        train_scores, test_scores: array shape (len(param_range), cv) giống validation_curve
+    """
+    sizes = sorted(param_range)
+    scorer = get_scorer(scoring)
+    folds = make_folds(y, n_splits=cv, stratified=is_classifier(estimator), cache_path=cache_path)
+    outputs = Parallel(n_jobs=n_jobs)(
+        delayed(_grow_and_score)(estimator, X, y, train_idx, test_idx, sizes, param_name, scorer)
+        for train_idx, test_idx in folds
+    )
+    train_scores = np.array([train for train, _ in outputs]).T
+    test_scores = np.array([test for _, test in outputs]).T
+
+    # Trả về theo đúng thứ tự param_range đầu vào
+    order = [sizes.index(value) for value in param_range]
+    return train_scores[order], test_scores[order]
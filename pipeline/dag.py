@@ -0,0 +1,332 @@
+"""
+Pipeline DAG Runner
+===================
+Chạy lại chuỗi script/notebook của các tuần như một DAG khai báo sẵn
+(pipeline/stages.py). Mỗi stage khai báo inputs, outputs và code của nó;
+quan hệ phụ thuộc suy ra từ việc input của stage này là output của stage khác.
+
+Một stage bị bỏ qua khi SHA-256 của code + inputs + lệnh chạy không đổi so với
+lần chạy thành công trước và các output vẫn còn nguyên. Vì so sánh theo nội
+dung (không theo thời gian sửa), stage upstream chạy lại mà cho output y hệt
+thì các stage downstream vẫn được bỏ qua. Các stage độc lập chạy song song.
+
+Trạng thái lưu ở .pipeline/state.json, log từng stage ở .pipeline/logs/.
+
+CLI:
+    python -m pipeline.dag                     # build toàn bộ
+    python -m pipeline.dag retrain -j 4        # chỉ stage retrain và các stage nó cần
+    python -m pipeline.dag --dry-run           # xem stage nào sẽ chạy
+    python -m pipeline.dag --force data_split  # ép chạy lại
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from pipeline.registry import _atomic_write, file_sha256
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+STATE_DIR = PROJECT_ROOT / '.pipeline'
+
+
+class Stage:
+    """Một bước của pipeline: lệnh chạy + các file nó đọc/ghi (đường dẫn tương đối project root)."""
+
+    def __init__(self, name: str, cmd: list, inputs=(), outputs=(), code=(), cwd: str = '.'):
+        self.name = name
+        self.cmd = list(cmd)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+        self.cwd = cwd
+
+    def __repr__(self):
+        return f"Stage({self.name!r})"
+
+
+def _covers(output: str, path: str) -> bool:
+    """output (file hoặc thư mục) có chứa path không."""
+    output, path = output.rstrip('/'), path.rstrip('/')
+    return path == output or path.startswith(output + '/') or output.startswith(path + '/')
+
+
+def build_graph(stages: list) -> dict:
+    """{tên stage: set tên các stage nó phụ thuộc}, kiểm tra trùng output và vòng lặp."""
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            for other_output, other in producers.items():
+                if _covers(other_output, output):
+                    raise ValueError(f"Output '{output}' được ghi bởi cả {other} và {stage.name}")
+            producers[output] = stage.name
+
+    graph = {}
+    for stage in stages:
+        graph[stage.name] = {
+            producer
+            for path in stage.inputs
+            for output, producer in producers.items()
+            if _covers(output, path) and producer != stage.name
+        }
+
+    # Phát hiện vòng lặp bằng DFS
+    visiting, done = set(), set()
+
+    def visit(name, trail):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"DAG có vòng lặp: {' -> '.join(trail + [name])}")
+        visiting.add(name)
+        for dep in graph[name]:
+            visit(dep, trail + [name])
+        visiting.discard(name)
+        done.add(name)
+
+    for name in graph:
+        visit(name, [])
+    return graph
+
+
+def _ancestors(graph: dict, targets: list) -> set:
+    selected, stack = set(), list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in selected:
+            selected.add(name)
+            stack.extend(graph[name])
+    return selected
+
+
+class HashCache:
+    """SHA-256 của file, dùng lại kết quả cũ nếu (mtime, size) không đổi."""
+
+    def __init__(self, entries: dict = None):
+        self.entries = entries or {}
+
+    def file(self, path: Path) -> str:
+        stat = path.stat()
+        key = str(path.relative_to(PROJECT_ROOT))
+        cached = self.entries.get(key)
+        if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+            return cached['sha256']
+        digest = file_sha256(path)
+        self.entries[key] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest}
+        return digest
+
+    def path(self, relative: str):
+        """Hash file, hoặc hash gộp của mọi file trong thư mục; None nếu không tồn tại."""
+        path = PROJECT_ROOT / relative
+        if path.is_file():
+            return self.file(path)
+        if path.is_dir():
+            digest = hashlib.sha256()
+            for child in sorted(path.rglob('*')):
+                if child.is_file() and not child.name.startswith('.'):
+                    digest.update(str(child.relative_to(path)).encode())
+                    digest.update(self.file(child).encode())
+            return digest.hexdigest()
+        return None
+
+
+def stage_key(stage: Stage, hashes: HashCache) -> str:
+    """Hash của lệnh + code + inputs; đổi bất kỳ thứ gì trong đó thì stage phải chạy lại."""
+    payload = {
+        'cmd': [str(part) for part in stage.cmd],
+        'code': {path: hashes.path(path) for path in stage.code},
+        'inputs': {path: hashes.path(path) for path in stage.inputs},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _is_fresh(stage: Stage, key: str, record: dict, hashes: HashCache) -> bool:
+    """Key khớp lần chạy trước và mọi output còn nguyên như lúc stage ghi ra."""
+    if not record or record.get('key') != key:
+        return False
+    recorded_outputs = record.get('outputs', {})
+    return all(
+        hashes.path(output) is not None and hashes.path(output) == recorded_outputs.get(output)
+        for output in stage.outputs
+    )
+
+
+def _execute(stage: Stage, log_dir: Path) -> tuple:
+    """Chạy lệnh của stage (trong thread worker), log stdout/stderr ra file."""
+    log_dir.mkdir(parents=True, exist_ok=True)
+    env = dict(os.environ, MPLBACKEND='Agg', PYTHONIOENCODING='utf-8')
+    start = time.perf_counter()
+    with open(log_dir / f'{stage.name}.log', 'w', encoding='utf-8') as log:
+        process = subprocess.run(stage.cmd, cwd=PROJECT_ROOT / stage.cwd, stdout=log,
+                                 stderr=subprocess.STDOUT, env=env)
+    return process.returncode, time.perf_counter() - start
+
+
+class PipelineRunner:
+    """Chạy DAG: stage nào đủ điều kiện (các dependency đã xong) thì submit vào pool."""
+
+    def __init__(self, stages: list, state_dir=STATE_DIR):
+        self.stages = {stage.name: stage for stage in stages}
+        self.graph = build_graph(stages)
+        self.state_dir = Path(state_dir)
+        self.state_path = self.state_dir / 'state.json'
+        state = {}
+        if self.state_path.exists():
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        self.records = state.get('stages', {})
+        self.hashes = HashCache(state.get('files', {}))
+
+    def _save_state(self):
+        payload = {'stages': self.records, 'files': self.hashes.entries}
+        _atomic_write(self.state_path, json.dumps(payload, indent=2, sort_keys=True).encode('utf-8'))
+
+    def _select(self, targets: list) -> set:
+        unknown = [name for name in targets or [] if name not in self.stages]
+        if unknown:
+            raise KeyError(f"Stage không tồn tại: {unknown}. Có: {sorted(self.stages)}")
+        return _ancestors(self.graph, targets) if targets else set(self.stages)
+
+    def plan(self, targets: list = None, force=()) -> dict:
+        """Trạng thái dự kiến (dry-run): 'fresh', 'stale', hoặc 'maybe' nếu phụ thuộc stage stale."""
+        selected = self._select(targets)
+        status = {}
+        for name in self._topological(selected):
+            stage = self.stages[name]
+            if any(status[dep] != 'fresh' for dep in self.graph[name]):
+                status[name] = 'maybe'
+            elif name in force or not _is_fresh(stage, stage_key(stage, self.hashes),
+                                                  self.records.get(name), self.hashes):
+                status[name] = 'stale'
+            else:
+                status[name] = 'fresh'
+        return status
+
+    def _topological(self, selected: set) -> list:
+        order, seen = [], set()
+
+        def visit(name):
+            if name in seen:
+                return
+            seen.add(name)
+            for dep in sorted(self.graph[name] & selected):
+                visit(dep)
+            order.append(name)
+
+        for name in sorted(selected):
+            visit(name)
+        return order
+
+    def run(self, targets: list = None, jobs: int = None, force=(), verbose: bool = True) -> dict:
+        """
+        Build các targets (mặc định toàn bộ). Trả về {tên stage: trạng thái}
+        với trạng thái 'skipped', 'ran', 'failed' hoặc 'blocked' (dependency lỗi).
+        """
+        selected = self._select(targets)
+        force = set(force)
+        pending = set(selected)
+        status = {}
+        running = {}
+        log_dir = self.state_dir / 'logs'
+
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+            while pending or running:
+                # Submit mọi stage có dependency đã xong; key được tính sau khi upstream ghi output
+                for name in sorted(pending):
+                    deps = self.graph[name] & selected
+                    if any(dep in pending or dep in running.values() for dep in deps):
+                        continue
+                    pending.discard(name)
+                    if any(status.get(dep) in ('failed', 'blocked') for dep in deps):
+                        status[name] = 'blocked'
+                        if verbose:
+                            print(f"  ⏭  {name}: bỏ qua vì dependency lỗi")
+                        continue
+                    stage = self.stages[name]
+                    key = stage_key(stage, self.hashes)
+                    if name not in force and _is_fresh(stage, key, self.records.get(name), self.hashes):
+                        status[name] = 'skipped'
+                        if verbose:
+                            print(f"  ✓  {name}: không đổi, bỏ qua")
+                        continue
+                    if verbose:
+                        print(f"  ▶  {name}: đang chạy...")
+                    running[pool.submit(_execute, stage, log_dir)] = name
+                    self.records.setdefault(name, {})['pending_key'] = key
+
+                if not running:
+                    continue
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    stage = self.stages[name]
+                    returncode, duration = future.result()
+                    record = self.records[name]
+                    key = record.pop('pending_key')
+                    missing = [output for output in stage.outputs if self.hashes.path(output) is None]
+                    if returncode != 0 or missing:
+                        status[name] = 'failed'
+                        record.pop('key', None)
+                        reason = f"exit code {returncode}" if returncode else f"thiếu output {missing}"
+                        if verbose:
+                            print(f"  ✗  {name}: lỗi ({reason}), xem {log_dir / (name + '.log')}")
+                    else:
+                        status[name] = 'ran'
+                        record.update({
+                            'key': key,
+                            'outputs': {output: self.hashes.path(output) for output in stage.outputs},
+                            'duration': round(duration, 2),
+                            'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                        })
+                        if verbose:
+                            print(f"  ✔  {name}: xong sau {duration:.1f}s")
+                    self._save_state()
+        return status
+
+
+def main():
+    from pipeline.stages import STAGES
+
+    parser = argparse.ArgumentParser(description="Chạy pipeline các tuần theo DAG, bỏ qua stage không đổi")
+    parser.add_argument('targets', nargs='*', help="Stage cần build (mặc định: tất cả)")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="Số stage chạy song song")
+    parser.add_argument('--force', nargs='*', default=None,
+                        help="Ép chạy lại các stage này (không kèm tên = mọi stage được chọn)")
+    parser.add_argument('--dry-run', action='store_true', help="Chỉ in stage nào sẽ chạy")
+    parser.add_argument('--list', action='store_true', help="In DAG (stage và dependency)")
+    args = parser.parse_args()
+
+    runner = PipelineRunner(STAGES)
+    if args.list:
+        for name in runner._topological(set(runner.stages)):
+            deps = ', '.join(sorted(runner.graph[name])) or '-'
+            print(f"{name:<24} <- {deps}")
+        return
+
+    force = args.force
+    if force is not None and not force:
+        force = runner._select(args.targets)
+    force = set(force or ())
+
+    if args.dry_run:
+        for name, state in runner.plan(args.targets, force=force).items():
+            print(f"{state:<6} {name}")
+        return
+
+    start = time.perf_counter()
+    status = runner.run(args.targets, jobs=args.jobs, force=force)
+    counts = {state: sum(1 for value in status.values() if value == state)
+              for state in ('ran', 'skipped', 'failed', 'blocked')}
+    print(f"\nHoàn tất sau {time.perf_counter() - start:.1f}s: {counts['ran']} chạy, "
+          f"{counts['skipped']} bỏ qua, {counts['failed']} lỗi, {counts['blocked']} bị chặn")
+    if counts['failed'] or counts['blocked']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+"""
+Feature Drift Monitor
+=====================
+So sánh phân phối features của request thật với dữ liệu train.
+
+- build_baseline(X): chạy lúc train (retrain.py lưu vào artifact) - mỗi feature
+  một bộ bin cố định + tỉ lệ baseline:
+    * feature ít giá trị (flag genre_/is_, tháng, thứ...) -> mỗi giá trị một bin
+    * feature liên tục -> bin theo decile của dữ liệu train (2 bin ngoài cùng
+      mở rộng tới +/- vô cực nên budget tăng vọt vẫn rơi vào bin cuối)
+- DriftMonitor.observe(x): mỗi request chỉ tìm bin cho cả vector bằng một phép
+  so sánh (F, B) rồi cộng count - vài micro giây, bộ nhớ cố định
+  (n_buckets x F x B số nguyên) bất kể bao nhiêu request.
+- Cửa sổ trượt: window_seconds chia thành n_buckets bucket xoay vòng; bucket cũ
+  được xoá khi thời gian quay lại slot của nó.
+- report(): PSI và KS (trên phân phối đã bin) của từng feature so với baseline.
+
+Ngưỡng PSI thường dùng: < 0.1 ổn định, 0.1-0.25 lệch vừa, >= 0.25 lệch đáng kể.
+KS so với giá trị tới hạn 1.36 * sqrt((n + m) / (n * m)) (alpha = 0.05).
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+N_BINS = 10
+MAX_CATEGORIES = 12
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+KS_COEFFICIENT = 1.36   # alpha = 0.05
+MIN_SAMPLES = 30
+EPSILON = 1e-4          # tránh log(0) khi một bin trống
+
+
+def _clean(values) -> np.ndarray:
+    # Cùng cách xử lý NaN/inf như select_features của retrain.py
+    return np.nan_to_num(np.asarray(values, dtype=float), nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def build_baseline(X: pd.DataFrame, n_bins: int = N_BINS, max_categories: int = MAX_CATEGORIES) -> dict:
+    """Baseline JSON-serializable: {'n_samples', 'features': {name: {kind, edges, proportions}}}."""
+    features = {}
+    for name in X.columns:
+        values = _clean(X[name])
+        unique = np.unique(values)
+        if len(unique) <= max_categories:
+            kind = 'categorical'
+            edges = (unique[:-1] + unique[1:]) / 2
+        else:
+            kind = 'numeric'
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+        features[name] = {
+            'kind': kind,
+            'edges': edges.tolist(),
+            'proportions': (counts / len(values)).tolist(),
+            'min': float(values.min()),
+            'max': float(values.max()),
+        }
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'n_samples': int(len(X)),
+        'n_bins': n_bins,
+        'features': features,
+    }
+
+
+def baseline_from_csv(filepath, feature_names: list, **kwargs) -> dict:
+    """Baseline từ clean_movies_features.csv (cho model cũ chưa lưu baseline lúc train)."""
+    from pipeline.schema import read_csv
+
+    wanted = set(feature_names)
+    df = read_csv(filepath, usecols=lambda column: column in wanted)
+    return build_baseline(df[[name for name in feature_names if name in df.columns]], **kwargs)
+
+
+def psi(live: np.ndarray, base: np.ndarray) -> np.ndarray:
+    """Population Stability Index theo hàng: live, base là tỉ lệ (..., B)."""
+    p = np.clip(live, EPSILON, None)
+    q = np.clip(base, EPSILON, None)
+    return ((p - q) * np.log(p / q)).sum(axis=-1)
+
+
+def ks_statistic(live: np.ndarray, base: np.ndarray) -> np.ndarray:
+    """KS trên phân phối đã bin: max |CDF_live - CDF_base| theo hàng."""
+    return np.abs(np.cumsum(live, axis=-1) - np.cumsum(base, axis=-1)).max(axis=-1)
+
+
+class DriftMonitor:
+    """
+    Args:
+        baseline: Kết quả build_baseline
+        feature_names: Thứ tự features của vector sẽ observe (thứ tự của model)
+        window_seconds: Độ dài cửa sổ trượt
+        n_buckets: Số bucket của cửa sổ (độ mịn khi trượt)
+    """
+
+    def __init__(self, baseline: dict, feature_names: list, window_seconds: float = 3600,
+                 n_buckets: int = 12):
+        self.baseline = baseline
+        self.window_seconds = window_seconds
+        self.n_buckets = n_buckets
+        self.bucket_seconds = window_seconds / n_buckets
+
+        # Chỉ theo dõi features có baseline; vị trí của chúng trong vector đầu vào
+        stats = baseline['features']
+        self.feature_names = [name for name in feature_names if name in stats]
+        self._columns = np.array([feature_names.index(name) for name in self.feature_names], dtype=np.intp)
+        n_features = len(self.feature_names)
+        max_bins = max((len(stats[name]['proportions']) for name in self.feature_names), default=1)
+
+        # Edges đệm +inf -> bin = số edge <= x (= searchsorted side='right')
+        self._edges = np.full((n_features, max(max_bins - 1, 1)), np.inf)
+        self._base = np.zeros((n_features, max_bins))
+        self._kinds = []
+        for i, name in enumerate(self.feature_names):
+            edges = stats[name]['edges']
+            self._edges[i, :len(edges)] = edges
+            self._base[i, :len(stats[name]['proportions'])] = stats[name]['proportions']
+            self._kinds.append(stats[name]['kind'])
+        self._row_offsets = np.arange(n_features) * max_bins
+
+        self._lock = threading.Lock()
+        self._window = np.zeros((n_buckets, n_features, max_bins), dtype=np.int64)
+        self._bucket_ids = np.full(n_buckets, -1, dtype=np.int64)
+        self._lifetime = np.zeros((n_features, max_bins), dtype=np.int64)
+        self._observed = 0
+        self._started = time.time()
+
+    def observe(self, features: np.ndarray) -> None:
+        """Cộng một request (vector features chưa scale, shape (n,) hoặc (1, n))."""
+        x = np.asarray(features, dtype=float).ravel()[self._columns]  # fancy index -> bản copy
+        x[~np.isfinite(x)] = 0.0
+        # Vị trí phẳng (feature, bin) trong ma trận count (F, B)
+        cells = self._row_offsets + (x[:, None] >= self._edges).sum(axis=1)
+        bucket = int(time.monotonic() // self.bucket_seconds)
+        slot = bucket % self.n_buckets
+        with self._lock:
+            if self._bucket_ids[slot] != bucket:
+                self._window[slot] = 0
+                self._bucket_ids[slot] = bucket
+            self._window[slot].reshape(-1)[cells] += 1
+            self._lifetime.reshape(-1)[cells] += 1
+            self._observed += 1
+
+    def _counts(self, window: str) -> np.ndarray:
+        with self._lock:
+            if window == 'lifetime':
+                return self._lifetime.copy()
+            current = int(time.monotonic() // self.bucket_seconds)
+            live = self._bucket_ids > current - self.n_buckets
+            return self._window[live].sum(axis=0)
+
+    def report(self, window: str = 'window', min_samples: int = MIN_SAMPLES) -> dict:
+        """
+        PSI/KS từng feature của cửa sổ trượt (window='window') hoặc từ lúc start
+        (window='lifetime'), sắp xếp theo PSI giảm dần.
+        """
+        counts = self._counts(window)
+        n = int(counts[0].sum()) if len(counts) else 0
+        m = self.baseline['n_samples']
+        live = counts / n if n else np.zeros_like(self._base)
+        psi_values = psi(live, self._base)
+        ks_values = ks_statistic(live, self._base)
+        ks_critical = KS_COEFFICIENT * np.sqrt((n + m) / (n * m)) if n else None
+
+        features = []
+        for i, name in enumerate(self.feature_names):
+            if n < min_samples:
+                status = 'insufficient_data'
+            elif psi_values[i] >= PSI_SIGNIFICANT:
+                status = 'significant'
+            elif psi_values[i] >= PSI_MODERATE:
+                status = 'moderate'
+            else:
+                status = 'stable'
+            features.append({
+                'feature': name,
+                'kind': self._kinds[i],
+                'psi': round(float(psi_values[i]), 4) if n else None,
+                'ks': round(float(ks_values[i]), 4) if n else None,
+                'ks_drift': bool(n >= min_samples and ks_values[i] > ks_critical),
+                'status': status,
+            })
+        features.sort(key=lambda item: -(item['psi'] or 0))
+
+        summary = {}
+        for item in features:
+            summary[item['status']] = summary.get(item['status'], 0) + 1
+        return {
+            'window': window,
+            'window_seconds': self.window_seconds if window != 'lifetime' else time.time() - self._started,
+            'n_samples': n,
+            'baseline_samples': m,
+            'baseline_created_at': self.baseline.get('created_at'),
+            'observed_total': self._observed,
+            'ks_critical': round(float(ks_critical), 4) if ks_critical is not None else None,
+            'summary': summary,
+            'drifted': [item['feature'] for item in features
+                        if item['status'] in ('moderate', 'significant') or item['ks_drift']],
+            'features': features,
+        }
@@ -0,0 +1,230 @@
+"""
+Successive Halving Search với trials lưu trên đĩa
+=================================================
+Mỗi vòng (rung) đánh giá các candidate với budget nhỏ, giữ lại 1/factor
+candidate tốt nhất rồi tăng budget lên factor lần cho vòng sau.
+Budget là n_estimators (mặc định) hoặc số mẫu train ('n_samples').
+
+Mọi trial (params, budget, CV scores) được ghi nối tiếp vào file JSONL.
+Chạy lại với cùng file -> các trial đã có được đọc lại thay vì train lại,
+nên search bị ngắt giữa chừng hoặc mở rộng thêm candidate sẽ chạy tiếp.
+"""
+
+import hashlib
+import json
+import math
+import os
+import time
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+from pipeline.cv import cross_validate_models
+
+
+def data_fingerprint(X, y, cv: int, scoring: str = None, estimator=None, resource: str = None,
+                     random_state: int = None) -> str:
+    """
+    Hash ngắn của mọi thứ quyết định điểm của một trial ngoài (params, budget):
+    dữ liệu, số folds, scoring, estimator gốc (class + get_params), loại budget
+    và random_state (chọn mẫu ở chế độ n_samples). Đổi bất kỳ thứ nào -> trial
+    cũ trong file không được dùng lại.
+    """
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(np.asarray(X, dtype=np.float64)).tobytes())
+    digest.update(np.ascontiguousarray(np.asarray(y)).tobytes())
+    settings = {
+        'cv': cv,
+        'scoring': scoring,
+        'estimator': type(estimator).__name__ if estimator is not None else None,
+        'estimator_params': estimator.get_params(deep=False) if estimator is not None else None,
+        'resource': resource,
+        'random_state': random_state,
+    }
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
+
+
+class TrialStore:
+    """Lưu trials dạng JSONL (mỗi dòng một trial), append-only."""
+
+    def __init__(self, path, fingerprint: str):
+        self.path = path
+        self.fingerprint = fingerprint
+        self._trials = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        trial = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Dòng cuối có thể bị cắt dở khi process bị kill
+                        continue
+                    if trial.get('data') == fingerprint:
+                        self._trials[trial['key']] = trial
+
+    @staticmethod
+    def make_key(params: dict, resource: int) -> str:
+        return json.dumps({'params': params, 'resource': resource}, sort_keys=True, default=str)
+
+    def __len__(self):
+        return len(self._trials)
+
+    def get(self, params: dict, resource: int):
+        return self._trials.get(self.make_key(params, resource))
+
+    def add(self, params: dict, resource: int, scores: list, fit_time: float) -> dict:
+        trial = {
+            'key': self.make_key(params, resource),
+            'data': self.fingerprint,
+            'params': params,
+            'resource': resource,
+            'scores': [float(s) for s in scores],
+            'mean_score': float(np.mean(scores)),
+            'fit_time': float(fit_time),
+            'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        self._trials[trial['key']] = trial
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(trial, default=str) + '\n')
+                f.flush()
+        return trial
+
+
+def _subsample(X, y, n_samples: int, random_state: int):
+    """Lấy n_samples mẫu đầu của một hoán vị cố định (các vòng sau chứa mẫu của vòng trước)."""
+    if n_samples >= len(y):
+        return X, y
+    order = np.random.RandomState(random_state).permutation(len(y))[:n_samples]
+    order.sort()
+    take = (lambda data: data.iloc[order]) if hasattr(X, 'iloc') else (lambda data: data[order])
+    return take(X), (y.iloc[order] if hasattr(y, 'iloc') else y[order])
+
+
+def _rung_resources(min_resource: int, max_resource: int, factor: int) -> list:
+    resources = []
+    resource = min_resource
+    while resource < max_resource:
+        resources.append(int(resource))
+        resource *= factor
+    resources.append(int(max_resource))
+    return resources
+
+
+def successive_halving_search(estimator, param_grid: dict, X, y, resource: str = 'n_estimators',
+                              min_resource: int = None, max_resource: int = None, factor: int = 3,
+                              n_candidates=None, scoring: str = 'f1', cv: int = 5,
+                              trials_path=None, n_jobs: int = -1, batch_size: int = 16,
+                              random_state: int = 42, verbose: bool = True) -> dict:
+    """
+    Successive halving trên param_grid với trials resumable.
+
+    Args:
+        estimator: Estimator gốc (vd. RandomForestClassifier)
+        param_grid: Grid tham số (nếu resource='n_estimators', key này bị bỏ khỏi grid)
+        resource: 'n_estimators' hoặc 'n_samples'
+        min_resource / max_resource: Budget vòng đầu / vòng cuối
+        factor: Giữ lại 1/factor candidate mỗi vòng, budget nhân factor
+        n_candidates: Số candidate lấy mẫu từ grid (None = toàn bộ grid)
+        trials_path: File JSONL lưu trials (None = không lưu)
+        batch_size: Số candidate mỗi batch; trials được ghi sau mỗi batch
+
+    Returns:
+        dict với best_params (đã gồm budget cuối), best_score, rungs, n_trials_run...
+    """
+    param_grid = dict(param_grid)
+    if resource == 'n_estimators':
+        budget_values = param_grid.pop('n_estimators', None)
+        if max_resource is None:
+            max_resource = max(budget_values) if budget_values else 300
+        if min_resource is None:
+            min_resource = min(budget_values) // factor if budget_values else 10
+    elif resource == 'n_samples':
+        if max_resource is None:
+            max_resource = len(y)
+        if min_resource is None:
+            min_resource = max(cv * 10, max_resource // factor ** 3)
+    else:
+        raise ValueError(f"resource không hợp lệ: {resource}")
+
+    if n_candidates is None:
+        candidates = list(ParameterGrid(param_grid))
+    else:
+        candidates = list(ParameterSampler(param_grid, n_iter=n_candidates, random_state=random_state))
+
+    store = TrialStore(trials_path, data_fingerprint(X, y, cv, scoring=scoring, estimator=estimator,
+                                                     resource=resource, random_state=random_state))
+    folds_cache = None
+    if trials_path:
+        folds_cache = os.path.splitext(trials_path)[0] + '_folds.npz'
+
+    resources = _rung_resources(min_resource, max_resource, factor)
+    n_trials_run = 0
+    n_trials_reused = 0
+    rungs = []
+    survivors = candidates
+
+    for rung, budget in enumerate(resources):
+        if resource == 'n_samples':
+            X_rung, y_rung = _subsample(X, y, budget, random_state)
+            rung_cache = None
+        else:
+            X_rung, y_rung = X, y
+            rung_cache = folds_cache
+
+        pending = [params for params in survivors if store.get(params, budget) is None]
+        n_trials_reused += len(survivors) - len(pending)
+        if verbose:
+            print(f"  Rung {rung}: {len(survivors)} candidates, {resource}={budget} "
+                  f"({len(survivors) - len(pending)} trial đã có, {len(pending)} cần chạy)")
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            models = {}
+            for params in batch:
+                model = clone(estimator).set_params(**params)
+                if resource == 'n_estimators':
+                    model.set_params(n_estimators=budget)
+                models[store.make_key(params, budget)] = model
+            results = cross_validate_models(models, X_rung, y_rung, scoring=[scoring], cv=cv,
+                                            n_jobs=n_jobs, return_train_score=False,
+                                            cache_path=rung_cache)
+            for params in batch:
+                res = results[store.make_key(params, budget)]
+                store.add(params, budget, res[f'test_{scoring}'], res['fit_time'].sum())
+            n_trials_run += len(batch)
+
+        scored = sorted(survivors, key=lambda params: store.get(params, budget)['mean_score'], reverse=True)
+        rungs.append({
+            'rung': rung,
+            'resource': budget,
+            'n_candidates': len(survivors),
+            'best_score': store.get(scored[0], budget)['mean_score'],
+        })
+        if rung < len(resources) - 1:
+            survivors = scored[:max(1, math.ceil(len(scored) / factor))]
+        else:
+            survivors = scored
+
+    best = survivors[0]
+    best_trial = store.get(best, resources[-1])
+    best_params = dict(best)
+    if resource == 'n_estimators':
+        best_params['n_estimators'] = resources[-1]
+
+    return {
+        'best_params': best_params,
+        'best_score': best_trial['mean_score'],
+        'resource': resource,
+        'rungs': rungs,
+        'n_candidates': len(candidates),
+        'n_trials_run': n_trials_run,
+        'n_trials_reused': n_trials_reused,
+        'trials_path': trials_path,
+    }
@@ -0,0 +1,287 @@
+"""
+Prediction Audit Log
+====================
+Ghi lại mọi prediction của web app (features chưa scale, xác suất, model
+version, độ trễ) để theo dõi và làm dữ liệu cho retrain.
+
+- Request thread chỉ append vào deque (thao tác nguyên tử, không lock, không
+  chạm đĩa). Hàng đợi đầy (đĩa chậm) -> record bị bỏ và đếm vào 'dropped',
+  request không bao giờ phải chờ.
+- Một background thread kiểm tra hàng đợi mỗi flush_interval giây và ghi nó
+  thành một part file dạng cột (.npz nén, cùng kiểu lưu theo block numpy như
+  split_store) khi đủ batch_size record hoặc record cũ nhất đã chờ max_delay
+  giây - server ít request không sinh mỗi giây một file. Không giữ record nào
+  trong RAM ngoài hàng đợi: process bị kill chỉ mất phần đang chờ
+  (<= capacity record, <= max_delay giây).
+- Lỗi bất kỳ khi ghi (không chỉ OSError) được log, đếm vào 'write_errors' /
+  'writer_errors' của stats() và writer thread vẫn chạy tiếp.
+
+    data/prediction_log/
+        predictions-20250101T120000-<pid>-000001.part.npz   # một batch
+        predictions-20250101T120000-<pid>-000061.npz        # segment đã gộp
+            timestamp (n,) float64   probability (n,) float32   success (n,) bool
+            latency_ms (n,) float32  features (n, d) float32
+            feature_names (d,)       model_version ()         sources (k,)
+
+- Mỗi compact_parts part, writer gộp chúng thành một segment (mỗi segment một
+  model version / feature_names) rồi xoá part. Segment ghi tên các part nguồn
+  ('sources') nên nếu process chết trước khi xoá xong, reader bỏ qua part đã
+  được gộp thay vì đọc trùng. Mọi file ghi atomic (tmp + os.replace).
+
+Đọc lại: load_prediction_log(log_dir) -> DataFrame (mỗi feature một cột).
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_LOG_DIR = PROJECT_ROOT / 'data' / 'prediction_log'
+SEGMENT_PREFIX = 'predictions-'
+PART_SUFFIX = '.part.npz'
+ROW_COLUMNS = ('timestamp', 'probability', 'success', 'latency_ms', 'features')
+
+
+class PredictionLogWriter:
+    """
+    Args:
+        log_dir: Thư mục chứa part/segment
+        capacity: Số record tối đa trong RAM (đang chờ ghi); vượt quá thì bỏ record
+        batch_size: Writer thức dậy sớm khi hàng đợi có ngần này record
+        flush_interval: Chu kỳ (giây) writer kiểm tra hàng đợi
+        max_delay: Ghi part khi record cũ nhất đã chờ ngần này giây (dù chưa đủ batch_size)
+        compact_parts: Gộp part thành segment sau ngần này part (0 = không gộp)
+    """
+
+    def __init__(self, log_dir=DEFAULT_LOG_DIR, capacity: int = 10000, batch_size: int = 256,
+                 flush_interval: float = 1.0, max_delay: float = 30.0, compact_parts: int = 300):
+        self.log_dir = Path(log_dir)
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_delay = max_delay
+        self.compact_parts = compact_parts
+
+        self._queue = deque()
+        self._flush_requests = deque()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._stats_lock = threading.Lock()  # chỉ cho counter, không giữ khi ghi đĩa
+        self._dropped = 0
+        self._written = 0
+        self._parts = 0
+        self._segments = 0
+        self._write_errors = 0
+        self._writer_errors = 0
+        self._sequence = 0
+        self._pending_parts = []  # part của process này chưa được gộp
+
+        self._thread = threading.Thread(target=self._run, name='prediction-log-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ============ Request thread ============
+
+    def record(self, features, probability: float, success: bool, latency_ms: float,
+               model_version: str, feature_names) -> bool:
+        """Đưa một prediction vào hàng đợi; False nếu bị bỏ (hàng đợi đầy hoặc writer đã dừng)."""
+        if len(self._queue) >= self.capacity or self._stopped.is_set():
+            with self._stats_lock:
+                self._dropped += 1
+            return False
+        self._queue.append((time.time(), features, probability, success, latency_ms,
+                            model_version, tuple(feature_names)))
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                'queued': len(self._queue),
+                'written': self._written,
+                'dropped': self._dropped,
+                'parts': self._parts,
+                'segments': self._segments,
+                'write_errors': self._write_errors,
+                'writer_errors': self._writer_errors,
+                'writer_alive': self._thread.is_alive(),
+                'log_dir': str(self.log_dir),
+            }
+
+    # ============ Writer thread ============
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            flushing = bool(self._flush_requests)
+            if flushing or self._batch_ready():
+                self._guarded(self._drain)
+            if self.compact_parts and len(self._pending_parts) >= self.compact_parts:
+                self._guarded(self._compact)
+            while flushing and self._flush_requests:
+                self._flush_requests.popleft().set()
+        self._guarded(self._drain)
+
+    def _guarded(self, step):
+        """Chạy một bước của writer; lỗi bất ngờ chỉ được log + đếm, thread không chết."""
+        try:
+            step()
+        except Exception:
+            logger.exception("Prediction log writer lỗi ở bước %s", step.__name__)
+            with self._stats_lock:
+                self._writer_errors += 1
+
+    def _batch_ready(self) -> bool:
+        # Chỉ writer thread popleft nên đọc phần tử đầu ở đây không race
+        queue = self._queue
+        return len(queue) >= self.batch_size or bool(queue) and time.time() - queue[0][0] >= self.max_delay
+
+    def _drain(self):
+        """Ghi mọi record đang chờ ra part file (tối đa capacity record mỗi lần)."""
+        batch = []
+        for _ in range(self.capacity):
+            try:
+                batch.append(self._queue.popleft())
+            except IndexError:
+                break
+        # Tách batch theo (model_version, feature_names): mỗi file một schema
+        start = 0
+        for end in range(1, len(batch) + 1):
+            if end < len(batch) and batch[end][5:] == batch[start][5:]:
+                continue
+            try:
+                self._write_part(batch[start:end])
+            except Exception:
+                # Record hỏng (vd. features khác shape) -> bỏ nhóm này, các nhóm khác vẫn được ghi
+                logger.exception("Không ghi được %d prediction", end - start)
+                with self._stats_lock:
+                    self._writer_errors += 1
+                    self._dropped += end - start
+            start = end
+
+    def _next_path(self, timestamp: float, suffix: str) -> Path:
+        self._sequence += 1
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.localtime(timestamp))
+        return self.log_dir / f'{SEGMENT_PREFIX}{stamp}-{os.getpid()}-{self._sequence:06d}{suffix}'
+
+    def _write_part(self, rows: list):
+        timestamp, features, probability, success, latency, model_version, feature_names = zip(*rows)
+        columns = {
+            'timestamp': np.asarray(timestamp, dtype=np.float64),
+            'probability': np.asarray(probability, dtype=np.float32),
+            'success': np.asarray(success, dtype=bool),
+            'latency_ms': np.asarray(latency, dtype=np.float32),
+            'features': np.asarray(np.vstack(features), dtype=np.float32),
+            'feature_names': np.asarray(feature_names[0]),
+            'model_version': np.asarray(model_version[0] or ''),
+        }
+        path = self._next_path(timestamp[0], PART_SUFFIX)
+        if not self._save(path, columns, len(rows)):
+            return
+        self._pending_parts.append(path)
+        with self._stats_lock:
+            self._written += len(rows)
+            self._parts += 1
+
+    def _compact(self):
+        """Gộp các part đã ghi thành segment (mỗi segment một schema), rồi xoá part."""
+        parts, self._pending_parts = self._pending_parts, []
+        groups = []
+        for path in parts:
+            with np.load(path, allow_pickle=False) as part:
+                columns = {name: part[name] for name in part.files}
+            key = (str(columns['model_version']), tuple(columns['feature_names'].tolist()))
+            if groups and groups[-1][0] == key:
+                groups[-1][1].append((path, columns))
+            else:
+                groups.append((key, [(path, columns)]))
+
+        for _, members in groups:
+            first = members[0][1]
+            merged = {name: np.concatenate([columns[name] for _, columns in members])
+                      for name in ROW_COLUMNS}
+            merged['feature_names'] = first['feature_names']
+            merged['model_version'] = first['model_version']
+            merged['sources'] = np.asarray([path.name for path, _ in members])
+            path = self._next_path(float(merged['timestamp'][0]), '.npz')
+            if not self._save(path, merged, 0):
+                continue
+            for source, _ in members:
+                source.unlink(missing_ok=True)
+            with self._stats_lock:
+                self._segments += 1
+
+    def _save(self, path: Path, columns: dict, rows: int) -> bool:
+        tmp_path = path.with_name(f'.{path.name[:-4]}.tmp.npz')  # bỏ đuôi .npz
+        try:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            np.savez_compressed(tmp_path, **columns)
+            os.replace(tmp_path, path)
+            return True
+        except Exception:
+            logger.exception(f"Không ghi được prediction log {path}")
+            with self._stats_lock:
+                self._write_errors += 1
+                self._dropped += rows
+            return False
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Yêu cầu writer ghi ngay hàng đợi ra đĩa; chờ tối đa timeout giây."""
+        done = threading.Event()
+        self._flush_requests.append(done)
+        self._wakeup.set()
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Dừng writer và ghi nốt hàng đợi."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+
+
+def load_prediction_log(log_dir=DEFAULT_LOG_DIR, since: float = None) -> pd.DataFrame:
+    """
+    Đọc tất cả segment + part thành một DataFrame: timestamp, model_version, probability,
+    success, latency_ms + một cột cho mỗi feature (features chưa scale).
+
+    Args:
+        since: Chỉ lấy record có timestamp >= since (epoch giây)
+    """
+    paths = sorted(Path(log_dir).glob(f'{SEGMENT_PREFIX}*.npz'))
+    # Part đã được gộp vào segment (process chết trước khi kịp xoá) -> bỏ qua
+    merged = set()
+    for path in paths:
+        if not path.name.endswith(PART_SUFFIX):
+            with np.load(path, allow_pickle=False) as segment:
+                if 'sources' in segment.files:
+                    merged.update(segment['sources'].tolist())
+
+    frames = []
+    for path in paths:
+        if path.name in merged:
+            continue
+        with np.load(path, allow_pickle=False) as segment:
+            frame = pd.DataFrame(segment['features'], columns=[str(n) for n in segment['feature_names']])
+            for name in ('latency_ms', 'success', 'probability'):
+                frame.insert(0, name, segment[name])
+            frame.insert(0, 'model_version', str(segment['model_version']))
+            frame.insert(0, 'timestamp', pd.to_datetime(segment['timestamp'], unit='s'))
+        if since is not None:
+            frame = frame[frame['timestamp'] >= pd.to_datetime(since, unit='s')]
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=['timestamp', 'model_version', 'probability', 'success', 'latency_ms'])
+    return pd.concat(frames, ignore_index=True)
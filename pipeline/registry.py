@@ -0,0 +1,235 @@
+"""
+Content-addressed Model Registry
+================================
+Lưu mỗi model artifact MỘT lần theo SHA-256 của nội dung, kèm manifest JSON
+(metrics, feature list, hash dữ liệu train, thời gian tạo) và một con trỏ
+"active" cho mỗi role (vd. 'pre_release'). Đổi con trỏ là thao tác atomic
+(ghi file tạm + os.replace), serving chỉ cần đọc con trỏ -> đường dẫn blob.
+
+Cấu trúc thư mục:
+    data/registry/
+        objects/<sha256>.pkl      # blob pickle (không trùng lặp)
+        manifests/<sha256>.json   # metadata của blob
+        active/<role>.json        # con trỏ {digest, activated_at}
+
+CLI:
+    python -m pipeline.registry list
+    python -m pipeline.registry import data/pkl/model.pkl --role pre_release
+    python -m pipeline.registry activate <digest> --role pre_release
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_REGISTRY_DIR = PROJECT_ROOT / 'data' / 'registry'
+
+
+def sha256_bytes(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()
+
+
+def file_sha256(path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 của file, đọc theo chunk (dùng cho hash dữ liệu train)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_write(path: Path, payload: bytes) -> None:
+    """Ghi file tạm cùng thư mục rồi os.replace -> người đọc không thấy file ghi dở."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ModelRegistry:
+    """Registry lưu model theo content hash với con trỏ active theo role."""
+
+    def __init__(self, root=DEFAULT_REGISTRY_DIR):
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.manifests_dir = self.root / 'manifests'
+        self.active_dir = self.root / 'active'
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / f'{digest}.pkl'
+
+    def manifest_path(self, digest: str) -> Path:
+        return self.manifests_dir / f'{digest}.json'
+
+    def put_bytes(self, payload: bytes, role: str, metrics: dict = None, feature_names: list = None,
+                  data_hash: str = None, **extra) -> str:
+        """
+        Lưu blob (nếu chưa có) + manifest, trả về digest.
+
+        Cùng nội dung put lại với role khác thì role đó được thêm vào 'roles' của
+        manifest; 'role' và metadata còn lại giữ nguyên theo lần put đầu tiên.
+        """
+        digest = sha256_bytes(payload)
+        blob_path = self.object_path(digest)
+        if not blob_path.exists():
+            _atomic_write(blob_path, payload)
+
+        manifest_path = self.manifest_path(digest)
+        if manifest_path.exists():
+            manifest = self.manifest(digest)
+            if role in manifest_roles(manifest):
+                return digest
+            manifest['roles'] = manifest_roles(manifest) + [role]
+        else:
+            manifest = {
+                'digest': digest,
+                'role': role,
+                'roles': [role],
+                'size_bytes': len(payload),
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'metrics': metrics or {},
+                'feature_names': list(feature_names or []),
+                'data_hash': data_hash,
+                **extra,
+            }
+        _atomic_write(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2,
+                                                default=_json_default).encode('utf-8'))
+        return digest
+
+    def put(self, artifact, role: str, **kwargs) -> str:
+        """Pickle artifact rồi lưu như put_bytes."""
+        return self.put_bytes(pickle.dumps(artifact, protocol=pickle.HIGHEST_PROTOCOL), role, **kwargs)
+
+    def activate(self, role: str, digest: str) -> None:
+        """Trỏ role tới digest (atomic)."""
+        if not self.object_path(digest).exists():
+            raise FileNotFoundError(f"Không có artifact {digest} trong registry {self.root}")
+        pointer = {'role': role, 'digest': digest, 'activated_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        _atomic_write(self.active_dir / f'{role}.json', json.dumps(pointer, indent=2).encode('utf-8'))
+
+    def active_digest(self, role: str):
+        """Digest đang active của role, None nếu chưa có."""
+        pointer_path = self.active_dir / f'{role}.json'
+        if not pointer_path.exists():
+            return None
+        with open(pointer_path, encoding='utf-8') as f:
+            return json.load(f)['digest']
+
+    def resolve(self, role: str):
+        """Đường dẫn blob đang active của role (None nếu chưa có)."""
+        digest = self.active_digest(role)
+        return self.object_path(digest) if digest else None
+
+    def manifest(self, digest: str) -> dict:
+        with open(self.manifest_path(digest), encoding='utf-8') as f:
+            return json.load(f)
+
+    def load(self, role: str):
+        """Unpickle artifact đang active của role."""
+        path = self.resolve(role)
+        if path is None:
+            raise FileNotFoundError(f"Role '{role}' chưa có artifact active trong {self.root}")
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def list(self, role: str = None) -> list:
+        """Danh sách manifest (mới nhất trước), lọc theo role nếu có."""
+        if not self.manifests_dir.exists():
+            return []
+        manifests = []
+        for path in self.manifests_dir.glob('*.json'):
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if role is None or role in manifest_roles(manifest):
+                manifests.append(manifest)
+        return sorted(manifests, key=lambda m: m.get('created_at', ''), reverse=True)
+
+
+def manifest_roles(manifest: dict) -> list:
+    """Các role đã put blob này (manifest cũ chỉ có 'role')."""
+    return list(manifest.get('roles') or [manifest['role']])
+
+
+def _json_default(value):
+    # numpy scalar / tuple trong metrics
+    if hasattr(value, 'item'):
+        return value.item()
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def import_pickle(registry: ModelRegistry, path, role: str, data_path=None, activate: bool = True) -> str:
+    """Đưa một file pkl có sẵn vào registry (metadata lấy từ dict nếu có)."""
+    with open(path, 'rb') as f:
+        payload = f.read()
+    artifact = pickle.loads(payload)
+    metrics, feature_names, extra = {}, [], {'source': str(path)}
+    if isinstance(artifact, dict):
+        metrics = artifact.get('metrics', {})
+        feature_names = artifact.get('feature_names', [])
+        for key in ('model_type', 'description'):
+            if key in artifact:
+                extra[key] = artifact[key]
+    data_hash = file_sha256(data_path) if data_path else None
+    digest = registry.put_bytes(payload, role, metrics=metrics, feature_names=feature_names,
+                                data_hash=data_hash, **extra)
+    if activate:
+        registry.activate(role, digest)
+    return digest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model registry (content-addressed)")
+    parser.add_argument('--root', default=str(DEFAULT_REGISTRY_DIR))
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = sub.add_parser('list', help="Liệt kê artifacts")
+    list_parser.add_argument('--role')
+
+    import_parser = sub.add_parser('import', help="Đưa file pkl có sẵn vào registry")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--role', required=True)
+    import_parser.add_argument('--data', help="File dữ liệu train để tính data_hash")
+    import_parser.add_argument('--no-activate', action='store_true')
+
+    activate_parser = sub.add_parser('activate', help="Đổi artifact active của role")
+    activate_parser.add_argument('digest')
+    activate_parser.add_argument('--role', required=True)
+
+    args = parser.parse_args()
+    registry = ModelRegistry(args.root)
+
+    if args.command == 'list':
+        for manifest in registry.list(args.role):
+            roles = [args.role] if args.role else manifest_roles(manifest)
+            active = any(registry.active_digest(role) == manifest['digest'] for role in roles)
+            accuracy = manifest.get('metrics', {}).get('accuracy')
+            print(f"{'*' if active else ' '} {','.join(roles):<14} {manifest['digest'][:12]} "
+                  f"{manifest['created_at']}  {manifest['size_bytes'] / 1024:.0f} KB  "
+                  f"acc={accuracy if accuracy is not None else '-'}")
+    elif args.command == 'import':
+        digest = import_pickle(registry, args.path, args.role, data_path=args.data,
+                               activate=not args.no_activate)
+        print(f"Imported {args.path} -> {digest}")
+    elif args.command == 'activate':
+        registry.activate(args.role, args.digest)
+        print(f"Role '{args.role}' -> {args.digest}")
+
+
+if __name__ == '__main__':
+    main()
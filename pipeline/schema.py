@@ -0,0 +1,98 @@
+"""
+Compact dtype schema cho các file CSV của pipeline
+==================================================
+Khai báo dtype cho từng cột thay vì để pandas tự suy luận:
+- Cờ 0/1 (genre_*, is_*, success) -> uint8
+- Năm/tháng/thứ/quý -> số nguyên nhỏ (nullable vì có hàng thiếu Release Date)
+- Cột văn bản ít giá trị (Original Language, main_genre, country_simple...) -> category
+
+Dùng:
+    from pipeline.schema import read_csv
+    df = read_csv('./data/clean_movies_features.csv')
+"""
+
+import csv
+
+import pandas as pd
+
+# Cờ 0/1
+FLAG_PREFIXES = ('genre_', 'is_')
+FLAG_COLUMNS = ['success', 'is_holiday_season']
+FLAG_DTYPE = 'uint8'
+
+# Số nguyên nhỏ. Dùng kiểu nullable (chữ hoa) cho cột có thể thiếu giá trị.
+INTEGER_DTYPES = {
+    'Runtime': 'int16',
+    'Vote Count': 'int32',
+    'release_year': 'Int16',
+    'release_month': 'Int8',
+    'release_weekday': 'Int8',
+    'release_quarter': 'Int8',
+    'runtime_minutes': 'int16',
+    'num_main_cast': 'int8',
+    'num_genres': 'int8',
+    'cast_genre_interaction': 'int16',
+}
+
+# Cột văn bản có ít giá trị khác nhau
+CATEGORICAL_COLUMNS = [
+    'Original Language',
+    'main_genre',
+    'country_simple',
+    'country_grouped',
+    'runtime_group',
+    'Director',
+]
+
+
+def is_flag_column(column: str) -> bool:
+    """Cột cờ 0/1 (one-hot genre/country, label...)."""
+    return column in FLAG_COLUMNS or column.startswith(FLAG_PREFIXES)
+
+
+def dtypes_for(columns, numeric: bool = True, categorical: bool = True) -> dict:
+    """
+    Trả về dict dtype cho các cột có trong schema.
+
+    Args:
+        columns: Danh sách tên cột của file
+        numeric: Áp dụng dtype cho cột cờ và số nguyên
+        categorical: Áp dụng dtype category cho cột văn bản
+    """
+    dtypes = {}
+    for column in columns:
+        if numeric and is_flag_column(column):
+            dtypes[column] = FLAG_DTYPE
+        elif numeric and column in INTEGER_DTYPES:
+            dtypes[column] = INTEGER_DTYPES[column]
+        elif categorical and column in CATEGORICAL_COLUMNS:
+            dtypes[column] = 'category'
+    return dtypes
+
+
+def read_header(filepath) -> list:
+    """Đọc dòng header của file CSV (nhanh hơn pd.read_csv(nrows=0))."""
+    with open(filepath, newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+
+def read_csv(filepath, numeric: bool = True, categorical: bool = True, **kwargs) -> pd.DataFrame:
+    """
+    pd.read_csv với dtype khai báo sẵn theo schema.
+    Header được đọc trước để áp dụng quy tắc tiền tố genre_/is_.
+    """
+    columns = read_header(filepath)
+    usecols = kwargs.get('usecols')
+    if callable(usecols):
+        columns = [column for column in columns if usecols(column)]
+    elif usecols is not None:
+        columns = list(usecols)
+    dtypes = dtypes_for(columns, numeric=numeric, categorical=categorical)
+    dtypes.update(kwargs.pop('dtype', None) or {})
+    return pd.read_csv(filepath, dtype=dtypes, **kwargs)
+
+
+def memory_report(df: pd.DataFrame) -> dict:
+    """Bộ nhớ (bytes) của DataFrame: tổng và trung bình mỗi hàng."""
+    total = int(df.memory_usage(deep=True).sum())
+    return {'total_bytes': total, 'bytes_per_row': total / max(len(df), 1)}
@@ -0,0 +1,164 @@
+"""
+Train/Test Split Store
+======================
+Lưu train/test split thành các block .npy riêng + manifest JSON nhỏ thay vì
+pickle cả DataFrame/Series/scaler vào một file:
+
+    data/split/
+        manifest.json      # feature_names, shapes, dtypes, tham số scaler
+        X_train.npy  X_test.npy  y_train.npy  y_test.npy
+        train_index.npy  test_index.npy   # index gốc trong clean_movies_features.csv
+
+Consumer chỉ cần metadata (feature list, scaler) đọc manifest, không phải
+load dữ liệu. Các block .npy được memory-map (mmap_mode='r') nên chỉ phần
+nào thực sự dùng mới được đọc từ đĩa.
+"""
+
+import json
+import os
+import pickle
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SPLIT_DIR = PROJECT_ROOT / 'data' / 'split'
+MANIFEST_NAME = 'manifest.json'
+TARGET_NAME = 'success'
+
+BLOCKS = ('X_train', 'X_test', 'y_train', 'y_test', 'train_index', 'test_index')
+
+
+def _scaler_to_dict(scaler) -> dict:
+    """Tham số MinMaxScaler dạng JSON (đủ để transform, không cần pickle)."""
+    if scaler is None:
+        return None
+    return {
+        'type': type(scaler).__name__,
+        'feature_range': list(scaler.feature_range),
+        'clip': bool(getattr(scaler, 'clip', False)),
+        'n_samples_seen': int(scaler.n_samples_seen_),
+        'data_min': scaler.data_min_.tolist(),
+        'data_max': scaler.data_max_.tolist(),
+        'data_range': scaler.data_range_.tolist(),
+        'scale': scaler.scale_.tolist(),
+        'min': scaler.min_.tolist(),
+    }
+
+
+def _scaler_from_dict(params: dict, feature_names: list):
+    if not params:
+        return None
+    if params['type'] != 'MinMaxScaler':
+        raise ValueError(f"Scaler không hỗ trợ: {params['type']}")
+    scaler = MinMaxScaler(feature_range=tuple(params['feature_range']), clip=params['clip'])
+    scaler.n_features_in_ = len(params['scale'])
+    scaler.n_samples_seen_ = params['n_samples_seen']
+    scaler.data_min_ = np.asarray(params['data_min'])
+    scaler.data_max_ = np.asarray(params['data_max'])
+    scaler.data_range_ = np.asarray(params['data_range'])
+    scaler.scale_ = np.asarray(params['scale'])
+    scaler.min_ = np.asarray(params['min'])
+    if feature_names:
+        scaler.feature_names_in_ = np.asarray(feature_names, dtype=object)
+    return scaler
+
+
+def save_split(X_train, X_test, y_train, y_test, scaler=None, feature_names=None,
+               split_dir=DEFAULT_SPLIT_DIR) -> dict:
+    """Ghi các block .npy và manifest. Trả về manifest."""
+    split_dir = Path(split_dir)
+    split_dir.mkdir(parents=True, exist_ok=True)
+    if feature_names is None:
+        feature_names = list(X_train.columns)
+
+    blocks = {
+        'X_train': np.ascontiguousarray(np.asarray(X_train, dtype=np.float64)),
+        'X_test': np.ascontiguousarray(np.asarray(X_test, dtype=np.float64)),
+        'y_train': np.asarray(y_train),
+        'y_test': np.asarray(y_test),
+        'train_index': np.asarray(getattr(X_train, 'index', np.arange(len(X_train)))),
+        'test_index': np.asarray(getattr(X_test, 'index', np.arange(len(X_test)))),
+    }
+    files = {}
+    for name, array in blocks.items():
+        np.save(split_dir / f'{name}.npy', array)
+        files[name] = {'file': f'{name}.npy', 'shape': list(array.shape), 'dtype': str(array.dtype)}
+
+    manifest = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'feature_names': list(feature_names),
+        'target': getattr(y_train, 'name', None) or TARGET_NAME,
+        'n_train': len(blocks['y_train']),
+        'n_test': len(blocks['y_test']),
+        'blocks': files,
+        'scaler': _scaler_to_dict(scaler),
+    }
+    tmp_path = split_dir / f'.{MANIFEST_NAME}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, split_dir / MANIFEST_NAME)
+    return manifest
+
+
+def load_manifest(split_dir=DEFAULT_SPLIT_DIR) -> dict:
+    """Chỉ đọc manifest JSON (feature names, shapes, scaler params)."""
+    with open(Path(split_dir) / MANIFEST_NAME, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_feature_names(split_dir=DEFAULT_SPLIT_DIR) -> list:
+    return load_manifest(split_dir)['feature_names']
+
+
+def load_scaler(split_dir=DEFAULT_SPLIT_DIR, manifest: dict = None):
+    """Dựng lại scaler đã fit từ manifest, không đụng tới dữ liệu."""
+    manifest = manifest or load_manifest(split_dir)
+    return _scaler_from_dict(manifest.get('scaler'), manifest['feature_names'])
+
+
+def load_array(name: str, split_dir=DEFAULT_SPLIT_DIR, mmap: bool = True) -> np.ndarray:
+    """Load một block (memory-mapped, chỉ đọc) theo tên: X_train, y_test..."""
+    if name not in BLOCKS:
+        raise KeyError(f"Block không tồn tại: {name}")
+    return np.load(Path(split_dir) / f'{name}.npy', mmap_mode='r' if mmap else None)
+
+
+def load_split(split_dir=DEFAULT_SPLIT_DIR, parts=('X_train', 'X_test', 'y_train', 'y_test'),
+               as_frame: bool = True, mmap: bool = True) -> dict:
+    """
+    Load các phần cần thiết của split, cùng format dict như train_test_data.pkl cũ:
+    {'X_train', 'X_test', 'y_train', 'y_test', 'scaler', 'feature_names'}.
+
+    Args:
+        parts: Chỉ load những block này
+        as_frame: True -> DataFrame/Series với tên cột và index gốc; False -> ndarray
+        mmap: Memory-map các block .npy
+    """
+    manifest = load_manifest(split_dir)
+    feature_names = manifest['feature_names']
+    result = {'feature_names': feature_names, 'scaler': load_scaler(manifest=manifest)}
+
+    for name in parts:
+        array = load_array(name, split_dir, mmap=mmap)
+        if as_frame and name in ('X_train', 'X_test', 'y_train', 'y_test'):
+            index = load_array('train_index' if name.endswith('train') else 'test_index', split_dir)
+            index = pd.Index(np.asarray(index))
+            if name.startswith('X'):
+                array = pd.DataFrame(array, columns=feature_names, index=index)
+            else:
+                array = pd.Series(array, name=manifest['target'], index=index)
+        result[name] = array
+    return result
+
+
+def convert_pickle(pkl_path, split_dir=DEFAULT_SPLIT_DIR) -> dict:
+    """Chuyển train_test_data.pkl (format cũ) sang split store."""
+    with open(pkl_path, 'rb') as f:
+        data = pickle.load(f)
+    return save_split(data['X_train'], data['X_test'], data['y_train'], data['y_test'],
+                      scaler=data.get('scaler'), feature_names=data.get('feature_names'),
+                      split_dir=split_dir)
@@ -0,0 +1,112 @@
+"""
+Khai báo DAG của pipeline (dùng bởi pipeline.dag)
+=================================================
+Mỗi stage là một script/notebook của các tuần với inputs, outputs và code
+(đường dẫn tương đối project root). Thứ tự chạy suy ra từ inputs/outputs:
+
+    cleandata -> crea_label -> feature_engineering -> data_split -> models tuần 5
+              -> hyperparameter_tuning -> phân tích tuần 6 (song song)
+    feature_engineering -> retrain (tuần 7)
+"""
+
+import sys
+
+from pipeline.dag import Stage
+
+PYTHON = sys.executable
+
+
+def script(path: str, *args) -> list:
+    return [PYTHON, path, *args]
+
+
+def notebook(path: str) -> list:
+    # Notebook chạy trong thư mục của nó (đường dẫn ../../data); bản đã chạy ghi vào .pipeline/
+    return [PYTHON, '-m', 'nbconvert', '--to', 'notebook', '--execute', path,
+            '--output-dir', '.pipeline/notebooks']
+
+
+SPLIT = 'data/split'
+LOGISTIC_MODEL = 'data/pkl/logistic_model.pkl'
+RF_MODEL = 'data/pkl/random_forest_model.pkl'
+OPTIMIZED_MODEL = 'data/pkl/optimized_rf_model.pkl'
+
+# Module dùng chung: đổi code ở đây thì các stage import nó phải chạy lại
+SCHEMA = 'pipeline/schema.py'
+SPLIT_STORE = 'pipeline/split_store.py'
+CV = 'pipeline/cv.py'
+
+
+STAGES = [
+    # Tuần 2-4: làm sạch, gán nhãn, feature engineering
+    Stage('cleandata', script('progress/week02/cleandata.py'),
+          inputs=['data/Movies.csv'],
+          outputs=['data/clean_movies.csv'],
+          code=['progress/week02/cleandata.py', SCHEMA]),
+    Stage('crea_label', notebook('progress/week03/crea_label.ipynb'),
+          inputs=['data/clean_movies.csv'],
+          outputs=['data/clean_movies_with_labels.csv'],
+          code=['progress/week03/crea_label.ipynb']),
+    Stage('feature_engineering', notebook('progress/week04/feature_engineering.ipynb'),
+          inputs=['data/clean_movies_with_labels.csv'],
+          outputs=['data/clean_movies_features.csv'],
+          code=['progress/week04/feature_engineering.ipynb']),
+
+    # Tuần 5: split + models cơ bản
+    Stage('data_split', script('progress/week05/data_split.py'),
+          inputs=['data/clean_movies_features.csv'],
+          outputs=[SPLIT],
+          code=['progress/week05/data_split.py', SCHEMA, SPLIT_STORE]),
+    Stage('logistic_regression', script('progress/week05/Logistic_Regression_Model/logistic_regression.py'),
+          inputs=[SPLIT],
+          outputs=[LOGISTIC_MODEL, 'progress/week05/Logistic_Regression_Model/logistic_results.txt'],
+          code=['progress/week05/Logistic_Regression_Model/logistic_regression.py', SPLIT_STORE]),
+    Stage('random_forest', script('progress/week05/Random_Forest_Model/random_forest.py'),
+          inputs=[SPLIT, 'progress/week05/Logistic_Regression_Model/logistic_results.txt'],
+          outputs=[RF_MODEL, 'progress/week05/Random_Forest_Model/random_forest_results.txt'],
+          code=['progress/week05/Random_Forest_Model/random_forest.py', SPLIT_STORE]),
+    Stage('cross_validation', script('progress/week05/CV-5Fold/cross_validation.py'),
+          inputs=[SPLIT, LOGISTIC_MODEL, RF_MODEL],
+          outputs=['progress/week05/CV-5Fold/cv_results.txt', 'progress/week05/CV-5Fold/cv_comparison.csv'],
+          code=['progress/week05/CV-5Fold/cross_validation.py', SPLIT_STORE, CV]),
+    Stage('feature_importance', script('progress/week05/phan_tich_dac_trung/feature_importance.py'),
+          inputs=[f'{SPLIT}/manifest.json', RF_MODEL],
+          outputs=['progress/week05/phan_tich_dac_trung/feature_importance.txt'],
+          code=['progress/week05/phan_tich_dac_trung/feature_importance.py', SPLIT_STORE]),
+    Stage('error_analysis', script('progress/week05/phan_tich_loi/error_analysis.py'),
+          inputs=[SPLIT, LOGISTIC_MODEL, RF_MODEL],
+          outputs=['progress/week05/phan_tich_loi/error_analysis.txt'],
+          code=['progress/week05/phan_tich_loi/error_analysis.py', SPLIT_STORE]),
+    Stage('model_selection', script('progress/week05/so_sanh_models/model_selection.py'),
+          inputs=[SPLIT, LOGISTIC_MODEL, RF_MODEL],
+          outputs=['data/pkl/best_model.pkl', 'progress/week05/so_sanh_models/model_selection.txt'],
+          code=['progress/week05/so_sanh_models/model_selection.py', SPLIT_STORE]),
+
+    # Tuần 6: tuning rồi các phân tích độc lập (chạy song song)
+    Stage('hyperparameter_tuning', script('progress/week06/hyperparameter_tuning.py'),
+          inputs=[SPLIT, RF_MODEL],
+          outputs=[OPTIMIZED_MODEL, 'progress/week06/hyperparameter_tuning_results.txt',
+                   'data/registry/active/optimized_rf.json'],
+          code=['progress/week06/hyperparameter_tuning.py', SPLIT_STORE, CV, 'pipeline/halving.py',
+                'pipeline/registry.py']),
+    Stage('overfitting_analysis', script('progress/week06/overfitting_analysis.py'),
+          inputs=[SPLIT, OPTIMIZED_MODEL],
+          outputs=['chart/week06/overfitting_analysis.png', 'progress/week06/overfitting_analysis.txt'],
+          code=['progress/week06/overfitting_analysis.py', SPLIT_STORE, CV]),
+    Stage('feature_analysis', script('progress/week06/phan_tich_feature/feature_analysis.py'),
+          inputs=[SPLIT, OPTIMIZED_MODEL],
+          outputs=['chart/week06/feature_importance_analysis.png', 'chart/week06/correlation_heatmap.png',
+                   'chart/week06/importance_vs_correlation.png',
+                   'progress/week06/feature_analysis_results.txt'],
+          code=['progress/week06/phan_tich_feature/feature_analysis.py', SPLIT_STORE]),
+    Stage('business_insights', script('progress/week06/phan_tich_feature/business_insights_analysis.py'),
+          inputs=[SPLIT, 'data/clean_movies_with_labels.csv', OPTIMIZED_MODEL],
+          outputs=['progress/week06/business_insights.md', 'chart/week06/business_insights_executive.png'],
+          code=['progress/week06/phan_tich_feature/business_insights_analysis.py', SCHEMA, SPLIT_STORE]),
+
+    # Tuần 7: Pre-Release model -> registry
+    Stage('retrain', script('progress/week07/retrain.py'),
+          inputs=['data/clean_movies_features.csv'],
+          outputs=['data/registry/active/pre_release.json', 'progress/week07/output/feature_importance.csv'],
+          code=['progress/week07/retrain.py', SCHEMA, 'pipeline/registry.py', 'pipeline/drift.py']),
+]
@@ -5,11 +5,51 @@
 # Chuyển Release Date sang kiểu ngày, thống kê tỉ lệ thiếu theo cột.
 # In ra các bước đã thực hiện và kết quả.
 # Clone dataset thành clean_movies.csv sau khi làm sạch.
+#
+# Có 2 chế độ:
+# - clean_data: đọc toàn bộ CSV vào RAM (phiên bản gốc).
+# - clean_data_chunked: đọc theo từng chunk, 2 lượt (lượt 1 tính mean + kiểu cột,
+#   lượt 2 điền NaN và ghi nối tiếp ra file) -> bộ nhớ bị chặn theo chunksize.
+# Chạy: python progress/week02/cleandata.py [--chunksize N] [--benchmark]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
 
 import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(PROJECT_ROOT)
+from pipeline import schema
+
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def _read_raw(file_path, **kwargs):
+    # Dữ liệu thô có thể thiếu giá trị ở cột số -> chỉ áp dụng dtype category
+    return schema.read_csv(file_path, numeric=False, **kwargs)
+
+
+def _is_text(series):
+    return (series.dtype == 'object' or pd.api.types.is_string_dtype(series)
+            or isinstance(series.dtype, pd.CategoricalDtype))
+
+
+def _fill_missing(df, fill_values):
+    # Cột category cần có sẵn 'Unknown' trong categories trước khi fillna
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype) and df[column].isnull().any():
+            if 'Unknown' not in df[column].cat.categories:
+                df[column] = df[column].cat.add_categories('Unknown')
+    return df.fillna(fill_values)
+
+
 def clean_data(file_path, output_path):
     # Đọc dữ liệu
-    df = pd.read_csv(file_path)
+    df = _read_raw(file_path)
 
     # Xử lý Budget hoặc Revenue = 0
     zero_budget_revenue = df[(df['Budget'] == 0) | (df['Revenue'] == 0)]
@@ -21,11 +61,14 @@ def clean_data(file_path, output_path):
     print("Số giá trị thiếu theo cột trước khi điền:")
     print(missing_values)
 
+    # Gom giá trị điền vào 1 dict rồi fillna một lần (tránh chained assignment trên slice)
+    fill_values = {}
     for column in df.columns:
-        if df[column].dtype == 'object':
-            df[column].fillna('Unknown', inplace=True)
+        if _is_text(df[column]):
+            fill_values[column] = 'Unknown'
         else:
-            df[column].fillna(df[column].mean(), inplace=True)
+            fill_values[column] = df[column].mean()
+    df = _fill_missing(df, fill_values)
 
     missing_values_after = df.isnull().sum()
     print("Số giá trị thiếu theo cột sau khi điền:")
@@ -40,6 +83,140 @@ def clean_data(file_path, output_path):
     df.to_csv(output_path, index=False)
     print(f"Dữ liệu đã được làm sạch và lưu vào {output_path}")
 
-clean_data('./data/Movies.csv', './data/clean_movies.csv')
 
+def _scan_columns(file_path, chunksize):
+    """
+    Lượt 1: đọc từng chunk để xác định kiểu cột và tính mean các cột số.
+    Kiểu cột được gộp giống khi đọc cả file: có chunk nào là chuỗi -> chuỗi,
+    có chunk nào là float (vd. do NaN) -> float.
+    """
+    kinds = {}
+    sums = {}
+    counts = {}
+    missing = None
+    n_zero = 0
+
+    for chunk in _read_raw(file_path, chunksize=chunksize):
+        for column in chunk.columns:
+            if _is_text(chunk[column]):
+                kind = 'text'
+            elif pd.api.types.is_float_dtype(chunk[column]):
+                kind = 'float'
+            else:
+                kind = 'int'
+            previous = kinds.get(column, kind)
+            if 'text' in (previous, kind):
+                kinds[column] = 'text'
+            elif 'float' in (previous, kind):
+                kinds[column] = 'float'
+            else:
+                kinds[column] = kind
+
+        mask = (chunk['Budget'] != 0) & (chunk['Revenue'] != 0)
+        n_zero += int((~mask).sum())
+        chunk = chunk[mask]
+
+        chunk_missing = chunk.isnull().sum()
+        missing = chunk_missing if missing is None else missing.add(chunk_missing, fill_value=0)
+
+        for column in chunk.columns:
+            if not _is_text(chunk[column]):
+                sums[column] = sums.get(column, 0.0) + float(chunk[column].sum())
+                counts[column] = counts.get(column, 0) + int(chunk[column].count())
+
+    fill_values = {}
+    for column, kind in kinds.items():
+        if kind == 'text':
+            fill_values[column] = 'Unknown'
+        elif counts.get(column):
+            fill_values[column] = sums[column] / counts[column]
+    return kinds, fill_values, missing, n_zero
+
+
+def clean_data_chunked(file_path, output_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Làm sạch dữ liệu theo từng chunk (out-of-core), kết quả giống clean_data.
+    Bộ nhớ tối đa ~ 1 chunk thay vì toàn bộ file.
+    """
+    kinds, fill_values, missing_values, n_zero = _scan_columns(file_path, chunksize)
+    print(f"Số hàng có Budget hoặc Revenue = 0: {n_zero}")
+    print("Số giá trị thiếu theo cột trước khi điền:")
+    print(missing_values.astype(int))
+
+    # Lượt 2: lọc, điền NaN, chuẩn hóa ngày và ghi nối tiếp
+    missing_release_dates = 0
+    n_rows = 0
+    header = True
+    for chunk in _read_raw(file_path, chunksize=chunksize):
+        chunk = chunk[(chunk['Budget'] != 0) & (chunk['Revenue'] != 0)]
+        chunk = _fill_missing(chunk, fill_values)
+        for column, kind in kinds.items():
+            if kind == 'float':
+                chunk[column] = chunk[column].astype('float64')
+            elif kind == 'text' and not _is_text(chunk[column]):
+                chunk[column] = chunk[column].astype('object')
+
+        chunk['Release Date'] = pd.to_datetime(chunk['Release Date'], errors='coerce')
+        missing_release_dates += int(chunk['Release Date'].isnull().sum())
+
+        chunk.to_csv(output_path, index=False, mode='w' if header else 'a', header=header)
+        header = False
+        n_rows += len(chunk)
+
+    print("Số giá trị thiếu theo cột sau khi điền: 0 (trừ Release Date không hợp lệ)")
+    print(f"Số giá trị thiếu trong Release Date sau khi chuyển đổi: {missing_release_dates}")
+    print(f"Dữ liệu đã được làm sạch ({n_rows} hàng) và lưu vào {output_path}")
+
+
+def _measure(func, *args, **kwargs):
+    """Trả về (thời gian chạy giây, peak memory MB) của func."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def benchmark(file_path, chunksize=DEFAULT_CHUNKSIZE):
+    """So sánh thời gian, peak memory và kết quả giữa 2 phiên bản."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        memory_output = os.path.join(tmp_dir, 'memory.csv')
+        chunked_output = os.path.join(tmp_dir, 'chunked.csv')
+
+        memory_time, memory_peak = _measure(clean_data, file_path, memory_output)
+        chunked_time, chunked_peak = _measure(
+            clean_data_chunked, file_path, chunked_output, chunksize=chunksize
+        )
+
+        same_output = pd.read_csv(memory_output).equals(pd.read_csv(chunked_output))
+
+    print("\n=== Benchmark clean_data vs clean_data_chunked ===")
+    print(f"{'Phiên bản':<22}{'Thời gian (s)':>15}{'Peak RAM (MB)':>15}")
+    print(f"{'clean_data':<22}{memory_time:>15.3f}{memory_peak:>15.2f}")
+    print(f"{'clean_data_chunked':<22}{chunked_time:>15.3f}{chunked_peak:>15.2f}")
+    print(f"chunksize = {chunksize}, kết quả giống nhau: {same_output}")
+    return {
+        'memory': {'time': memory_time, 'peak_mb': memory_peak},
+        'chunked': {'time': chunked_time, 'peak_mb': chunked_peak},
+        'same_output': same_output,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Làm sạch dữ liệu phim (tuần 2)")
+    parser.add_argument('--input', default='./data/Movies.csv')
+    parser.add_argument('--output', default='./data/clean_movies.csv')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help="Số hàng mỗi chunk; 0 = đọc toàn bộ file vào RAM")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="So sánh phiên bản chunked với phiên bản đọc toàn bộ")
+    args = parser.parse_args()
 
+    if args.benchmark:
+        benchmark(args.input, chunksize=args.chunksize or DEFAULT_CHUNKSIZE)
+    elif args.chunksize > 0:
+        clean_data_chunked(args.input, args.output, chunksize=args.chunksize)
+    else:
+        clean_data(args.input, args.output)
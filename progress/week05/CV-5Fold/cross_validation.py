@@ -5,19 +5,22 @@
 import pandas as pd
 import pickle
 import numpy as np
-from sklearn.model_selection import cross_val_score, cross_validate
+import time
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import make_scorer, f1_score
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from pipeline.split_store import load_split
+from pipeline.cv import cross_validate_models, write_comparison_table
 
 # 1. Load dữ liệu đã xử lý từ phần 1
-data_path = './data/pkl/train_test_data.pkl'
-if not os.path.exists(data_path):
+data_path = './data/split'
+if not os.path.exists(os.path.join(data_path, 'manifest.json')):
     raise FileNotFoundError(f"File {data_path} không tồn tại. Hãy chạy phần 1 trước.")
 
-with open(data_path, 'rb') as f:
-    data = pickle.load(f)
+data = load_split(data_path)
 
 X = pd.concat([data['X_train'], data['X_test']], ignore_index=True)
 y = pd.concat([data['y_train'], data['y_test']], ignore_index=True)
@@ -47,29 +50,39 @@ else:
 models = {'Logistic Regression': logistic_model, 'Random Forest': rf_model}
 
 # 3. Chạy 5-Fold CV cho Accuracy và F1-Score
+# Mỗi (model, fold) fit một lần, tính cả accuracy/f1 trên train và validation,
+# lưới model × fold chạy song song; fold splits cache tại data/pkl/cv_folds.npz
+start = time.perf_counter()
+cv_detail_all = cross_validate_models(
+    models, X, y, scoring=['accuracy', 'f1'], cv=5, n_jobs=-1,
+    return_train_score=True, cache_path='./data/pkl/cv_folds.npz'
+)
+cv_elapsed = time.perf_counter() - start
+n_fits = sum(len(detail['fit_time']) for detail in cv_detail_all.values())
+print(f"Thời gian chạy CV (song song): {cv_elapsed:.2f}s, {n_fits} lần fit, {os.cpu_count()} CPU")
+
 cv_results = {}
-for name, model in models.items():
+for name, cv_detail in cv_detail_all.items():
     print(f"\nĐánh giá {name} với 5-Fold CV...")
     # Accuracy
-    acc_scores = cross_val_score(model, X, y, cv=5, scoring='accuracy')
+    acc_scores = cv_detail['test_accuracy']
     acc_mean = acc_scores.mean()
     acc_std = acc_scores.std()
     acc_ci = 1.96 * acc_std  # 95% CI
 
     # F1-Score
-    f1_scores = cross_val_score(model, X, y, cv=5, scoring='f1')
+    f1_scores = cv_detail['test_f1']
     f1_mean = f1_scores.mean()
     f1_std = f1_scores.std()
     f1_ci = 1.96 * f1_std
 
     # Phát hiện overfitting: So sánh train vs validation score
-    cv_detail = cross_validate(model, X, y, cv=5, scoring=['accuracy', 'f1'], return_train_score=True)
     train_acc_mean = cv_detail['train_accuracy'].mean()
-    val_acc_mean = cv_detail['test_accuracy'].mean()
+    val_acc_mean = acc_mean
     overfitting_acc = train_acc_mean - val_acc_mean
 
     train_f1_mean = cv_detail['train_f1'].mean()
-    val_f1_mean = cv_detail['test_f1'].mean()
+    val_f1_mean = f1_mean
     overfitting_f1 = train_f1_mean - val_f1_mean
 
     cv_results[name] = {
@@ -113,6 +126,17 @@ with open(results_path, 'w') as f:
         rf_mean = cv_results['Random Forest'][metric]['mean']
         diff = rf_mean - log_mean
         f.write(f"{metric}: Logistic {log_mean:.4f}, RF {rf_mean:.4f} (RF tốt hơn: {diff:.4f})\n")
+    f.write("\n=== Thời gian ===\n")
+    f.write(f"CV: {cv_elapsed:.2f}s, {n_fits} lần fit (cách cũ: {3 * n_fits}), {os.cpu_count()} CPU\n")
+    # Không có CPU thứ hai thì chỉ còn lợi ích từ việc giảm số lần fit
+    if (os.cpu_count() or 1) == 1:
+        f.write("Ghi chú: 1 CPU -> tăng tốc bị chặn bởi tỉ lệ số lần fit (tối đa ~3x), "
+                "chưa đạt mục tiêu > 3x; lưới model × fold chỉ chạy song song khi có nhiều CPU.\n")
 
 print(f"Kết quả CV đã lưu vào: {results_path}")
+
+# Bảng so sánh dạng CSV (mean/std/CI/gap/thời gian fit)
+table_path = './progress/week05/CV-5Fold/cv_comparison.csv'
+write_comparison_table(cv_detail_all, table_path, scoring=['accuracy', 'f1'])
+print(f"Bảng so sánh đã lưu vào: {table_path}")
 print("Phần 4 hoàn thành! Sẵn sàng cho phần 5 (Feature Importance).")
\ No newline at end of file
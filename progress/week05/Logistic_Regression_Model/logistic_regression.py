@@ -7,21 +7,24 @@ import pickle
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, classification_report, confusion_matrix
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from pipeline.split_store import load_split
 
 # 1. Load dữ liệu đã xử lý từ phần 1
-data_path = './data/pkl/train_test_data.pkl'
-if not os.path.exists(data_path):
+data_path = './data/split'
+if not os.path.exists(os.path.join(data_path, 'manifest.json')):
     raise FileNotFoundError(f"File {data_path} không tồn tại. Hãy chạy phần 1 trước.")
 
-with open(data_path, 'rb') as f:
-    data = pickle.load(f)
+data = load_split(data_path)
 
 X_train = data['X_train']
 X_test = data['X_test']
 y_train = data['y_train']
 y_test = data['y_test']
 
-print("Dữ liệu load thành công từ pickle.")
+print("Dữ liệu load thành công từ data/split.")
 
 # 2. Triển khai Logistic Regression với tham số mặc định + max_iter=1000
 model = LogisticRegression(random_state=42, max_iter=1000)
@@ -8,10 +8,15 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import MinMaxScaler
 from imblearn.over_sampling import SMOTE
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from pipeline.schema import read_csv
+from pipeline.split_store import save_split
 
 # 1. Tải dữ liệu từ clean_movies_features.csv
 data_path = './data/clean_movies_features.csv'
-df = pd.read_csv(data_path)
+df = read_csv(data_path)
 print(f"Dữ liệu tải thành công: {len(df)} hàng, {len(df.columns)} cột")
 
 # 2. Xác định features và target
@@ -21,9 +26,11 @@ if target_col not in df.columns:
     raise ValueError(f"Cột target '{target_col}' không có trong dữ liệu.")
 
 # Features: tất cả cột số trừ target và ID nếu có
+# (cột văn bản được đọc thành object/category theo schema nên lọc bằng kiểu số)
 exclude_cols = [target_col, 'Id', 'Title']  # Loại bỏ cột không cần thiết
-features = [col for col in df.columns if col not in exclude_cols and df[col].dtype != 'object']
-X = df[features]
+features = [col for col in df.columns if col not in exclude_cols and pd.api.types.is_numeric_dtype(df[col])]
+# Cờ uint8 / số nguyên nhỏ -> float64 vì scaler trả về giá trị thực
+X = df[features].astype('float64')
 y = df[target_col]
 
 print(f"Features: {len(features)} cột")
@@ -80,18 +87,14 @@ else:
 # y_test.to_csv('y_test.csv', index=False)
 
 print("Chuẩn bị dữ liệu hoàn thành! Sẵn sàng cho modeling.")
-# Lưu bằng pkl để tiện sử dụng, chỉ cần load lại chứ không cần chia lại tỉ lệ train/test
+# Lưu thành các block .npy + manifest JSON để tiện sử dụng, chỉ cần load lại chứ không cần chia lại tỉ lệ train/test
 # 7. Lưu dữ liệu đã xử lý để dùng cho các bước sau
-import pickle
-output_path = './data/pkl/train_test_data.pkl'
-data_to_save = {
-    'X_train': X_train_scaled,
-    'X_test': X_test_scaled,
-    'y_train': y_train,
-    'y_test': y_test,
-    'scaler': scaler,  # Để scale dữ liệu mới nếu cần
-    'feature_names': features  # Danh sách tên features
-}
-with open(output_path, 'wb') as f:
-    pickle.dump(data_to_save, f)
-print(f"Dữ liệu đã lưu tại: {output_path}")
\ No newline at end of file
+# Consumer có thể memory-map từng block hoặc chỉ đọc manifest (feature names, scaler)
+output_dir = './data/split'
+save_split(
+    X_train_scaled, X_test_scaled, y_train, y_test,
+    scaler=scaler,  # Để scale dữ liệu mới nếu cần
+    feature_names=features,  # Danh sách tên features
+    split_dir=output_dir
+)
+print(f"Dữ liệu đã lưu tại: {output_dir}")
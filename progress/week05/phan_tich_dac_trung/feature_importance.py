@@ -2,16 +2,15 @@ import pickle
 import pandas as pd
 import numpy as np
 from sklearn.metrics import accuracy_score, f1_score
+import os
+import sys
 
-# Load data and models
-with open('./data/pkl/train_test_data.pkl', 'rb') as f:
-    data = pickle.load(f)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from pipeline.split_store import load_feature_names
 
-X_train = data['X_train']
-X_test = data['X_test']
-y_train = data['y_train']
-y_test = data['y_test']
-feature_names = data['feature_names']
+# Load feature names và model
+# Chỉ cần danh sách features -> đọc manifest, không load dữ liệu
+feature_names = load_feature_names('./data/split')
 
 with open('./data/pkl/random_forest_model.pkl', 'rb') as f:
     rf_model = pickle.load(f)
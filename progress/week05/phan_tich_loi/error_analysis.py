@@ -2,14 +2,17 @@ import pickle
 import pandas as pd
 import numpy as np
 from sklearn.metrics import confusion_matrix, classification_report, accuracy_score, f1_score
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from pipeline.split_store import load_split
 
 # Load data and models
-with open('./data/pkl/train_test_data.pkl', 'rb') as f:
-    data = pickle.load(f)
+# Chỉ load test set (memory-mapped) từ data/split
+data = load_split('./data/split', parts=('X_test', 'y_test'))
 
-X_train = data['X_train']
 X_test = data['X_test']
-y_train = data['y_train']
 y_test = data['y_test']
 feature_names = data['feature_names']
 
@@ -1,12 +1,17 @@
 import pickle
 import pandas as pd
 import numpy as np
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from pipeline.split_store import load_split
 
 # Tải kết quả từ các phần trước
 # Chúng ta có thể tải models và data để tóm tắt
 
-with open('./data/pkl/train_test_data.pkl', 'rb') as f:
-    data = pickle.load(f)
+# Chỉ load test set (memory-mapped) từ data/split
+data = load_split('./data/split', parts=('X_test', 'y_test'))
 
 X_test = data['X_test']
 y_test = data['y_test']
@@ -1,7 +1,14 @@
 # Bước 1.1: Hyperparameter Tuning cho Random Forest - Tuần 6
 # Mục đích: Tối ưu hóa Random Forest model để cải thiện hiệu suất và tránh overfitting
 # Tác dụng: Tìm best parameters, so sánh với model tuần 5, tạo optimized model
+#
+# Chế độ tuning:
+#   --mode random  : RandomizedSearchCV 50 candidates x full 5-fold (mặc định, như cũ)
+#   --mode halving : Successive halving với budget = n_estimators (hoặc --resource n_samples),
+#                    trials lưu ở --trials (JSONL) -> chạy lại sẽ tiếp tục thay vì train lại
+# Chạy: python progress/week06/hyperparameter_tuning.py --mode halving
 
+import argparse
 import pandas as pd
 import numpy as np
 import pickle
@@ -10,16 +17,32 @@ from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, classification_report, confusion_matrix
 import time
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from pipeline.split_store import load_split
+from pipeline.halving import successive_halving_search
+from pipeline.registry import ModelRegistry, file_sha256
+
+parser = argparse.ArgumentParser(description="Hyperparameter tuning Random Forest (tuần 6)")
+parser.add_argument('--mode', choices=['random', 'halving'], default='random')
+parser.add_argument('--resource', choices=['n_estimators', 'n_samples'], default='n_estimators',
+                    help="Budget cho successive halving")
+parser.add_argument('--factor', type=int, default=3, help="Tỉ lệ loại candidate mỗi vòng halving")
+parser.add_argument('--n-candidates', type=int, default=None,
+                    help="Số candidate lấy mẫu từ grid (mặc định: toàn bộ grid)")
+parser.add_argument('--trials', default='./progress/week06/ket_qua/halving_trials.jsonl',
+                    help="File JSONL lưu trials để resume")
+args = parser.parse_args()
 
 print("=== Bước 1.1: Hyperparameter Tuning cho Random Forest ===")
 
 # 1. Load dữ liệu đã xử lý từ tuần 5
-data_path = './data/pkl/train_test_data.pkl'
-if not os.path.exists(data_path):
+data_path = './data/split'
+if not os.path.exists(os.path.join(data_path, 'manifest.json')):
     raise FileNotFoundError(f"File {data_path} không tồn tại. Hãy chạy data_split.py từ tuần 5 trước.")
 
-with open(data_path, 'rb') as f:
-    data = pickle.load(f)
+data = load_split(data_path)
 
 X_train = data['X_train']
 X_test = data['X_test']
@@ -60,36 +83,59 @@ param_grid = {
 }
 
 print(f"Parameter combinations: {np.prod([len(v) for v in param_grid.values()])}")
-print("Sử dụng RandomizedSearchCV để tiết kiệm thời gian...")
 
-# 4. Hyperparameter tuning với RandomizedSearchCV (nhanh hơn GridSearchCV)
+# 4. Hyperparameter tuning
 rf = RandomForestClassifier(random_state=42)
 
-print("\n=== Bắt đầu Hyperparameter Tuning ===")
+print(f"\n=== Bắt đầu Hyperparameter Tuning (mode: {args.mode}) ===")
 start_time = time.time()
 
-# Sử dụng RandomizedSearchCV với 50 iterations
-random_search = RandomizedSearchCV(
-    estimator=rf,
-    param_distributions=param_grid,
-    n_iter=50,  # Thử 50 combinations ngẫu nhiên
-    cv=5,  # 5-fold cross-validation
-    scoring='f1',  # Tối ưu F1-score
-    n_jobs=-1,  # Sử dụng tất cả CPU cores
-    random_state=42,
-    verbose=1
-)
-
-random_search.fit(X_train, y_train)
+if args.mode == 'random':
+    print("Sử dụng RandomizedSearchCV để tiết kiệm thời gian...")
+    # Sử dụng RandomizedSearchCV với 50 iterations
+    random_search = RandomizedSearchCV(
+        estimator=rf,
+        param_distributions=param_grid,
+        n_iter=50,  # Thử 50 combinations ngẫu nhiên
+        cv=5,  # 5-fold cross-validation
+        scoring='f1',  # Tối ưu F1-score
+        n_jobs=-1,  # Sử dụng tất cả CPU cores
+        random_state=42,
+        verbose=1
+    )
+
+    random_search.fit(X_train, y_train)
+    best_model = random_search.best_estimator_
+    best_params = random_search.best_params_
+    best_cv_score = random_search.best_score_
+    n_tried = random_search.n_iter
+else:
+    print(f"Sử dụng Successive Halving (budget = {args.resource}), trials: {args.trials}")
+    halving_result = successive_halving_search(
+        rf, param_grid, X_train, y_train,
+        resource=args.resource,
+        factor=args.factor,
+        n_candidates=args.n_candidates,
+        scoring='f1',
+        cv=5,
+        trials_path=args.trials,
+        n_jobs=-1,
+        random_state=42
+    )
+    best_params = halving_result['best_params']
+    best_cv_score = halving_result['best_score']
+    n_tried = halving_result['n_candidates']
+    print(f"Trials mới: {halving_result['n_trials_run']}, dùng lại từ file: {halving_result['n_trials_reused']}")
+
+    # Refit best params trên toàn bộ train set với budget đầy đủ
+    best_model = RandomForestClassifier(random_state=42, **best_params)
+    best_model.fit(X_train, y_train)
+
 tuning_time = time.time() - start_time
 
 print(f"\nHyperparameter tuning hoàn thành trong {tuning_time:.2f} giây")
 
 # 5. Lấy best model và parameters
-best_model = random_search.best_estimator_
-best_params = random_search.best_params_
-best_cv_score = random_search.best_score_
-
 print(f"\n=== Best Parameters ===")
 for param, value in best_params.items():
     print(f"{param}: {value}")
@@ -186,7 +232,8 @@ optimized_data = {
     'test_accuracy': tuned_accuracy,
     'test_f1': tuned_f1,
     'feature_names': feature_names,
-    'tuning_time': tuning_time
+    'tuning_time': tuning_time,
+    'tuning_mode': args.mode
 }
 
 with open(optimized_model_path, 'wb') as f:
@@ -194,9 +241,21 @@ with open(optimized_model_path, 'wb') as f:
 
 print(f"Optimized model đã lưu vào: {optimized_model_path}")
 
+# Đăng ký cùng bytes vào registry: web app (prediction_service.py) resolve role 'optimized_rf'
+registry = ModelRegistry('./data/registry')
+with open(optimized_model_path, 'rb') as f:
+    digest = registry.put_bytes(
+        f.read(), 'optimized_rf',
+        metrics={'accuracy': tuned_accuracy, 'f1_score': tuned_f1, 'cv_f1': best_cv_score},
+        feature_names=feature_names, data_hash=file_sha256(os.path.join(data_path, 'manifest.json')),
+        model_type=type(best_model).__name__, source=optimized_model_path
+    )
+registry.activate('optimized_rf', digest)
+print(f"Registry role 'optimized_rf' -> {digest[:12]}")
+
 # 10. Tóm tắt kết quả
 print(f"\n=== TÓM TẮT HYPERPARAMETER TUNING ===")
-print(f"✅ Đã thử {random_search.n_iter} parameter combinations")
+print(f"✅ Đã thử {n_tried} parameter combinations")
 print(f"✅ Best CV F1-Score: {best_cv_score:.4f}")
 print(f"✅ Test F1-Score: {tuned_f1:.4f}")
 if baseline_f1 > 0:
@@ -10,22 +10,26 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import learning_curve, validation_curve
 from sklearn.metrics import accuracy_score, f1_score
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from pipeline.split_store import load_split
+from pipeline.cv import warm_start_curve
 
 print("=== Bước 1.2: Overfitting Analysis cho Random Forest ===")
 
 # 1. Load dữ liệu và optimized model từ Bước 1.1
-data_path = './data/pkl/train_test_data.pkl'
+data_path = './data/split'
 model_path = './data/pkl/optimized_rf_model.pkl'
 
-if not os.path.exists(data_path):
+if not os.path.exists(os.path.join(data_path, 'manifest.json')):
     raise FileNotFoundError(f"File {data_path} không tồn tại. Hãy chạy data_split.py từ tuần 5 trước.")
 
 if not os.path.exists(model_path):
     raise FileNotFoundError(f"File {model_path} không tồn tại. Hãy chạy hyperparameter_tuning.py trước.")
 
 # Load data
-with open(data_path, 'rb') as f:
-    data = pickle.load(f)
+data = load_split(data_path)
 
 X_train = data['X_train']
 X_test = data['X_test']
@@ -124,8 +128,9 @@ plt.grid(True, alpha=0.3)
 print("Đang tính validation curves...")
 
 # Validation curve cho n_estimators
+# Dùng warm_start: mỗi fold phát triển một forest 50 -> 300 cây thay vì train lại từ đầu mỗi mốc
 param_range_estimators = [50, 100, 150, 200, 250, 300]
-train_scores_est, val_scores_est = validation_curve(
+train_scores_est, val_scores_est = warm_start_curve(
     RandomForestClassifier(
         max_depth=best_params.get('max_depth'),
         min_samples_split=best_params.get('min_samples_split', 2),
@@ -133,8 +138,8 @@ train_scores_est, val_scores_est = validation_curve(
         random_state=42
     ),
     X_train, y_train,
-    param_name='n_estimators',
     param_range=param_range_estimators,
+    param_name='n_estimators',
     cv=5, scoring='f1', n_jobs=-1
 )
 
@@ -8,19 +8,23 @@ import pickle
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from pipeline.schema import read_csv
+from pipeline.split_store import load_split
 
 print("=== Bước 2.2: Business Insights Analysis ===")
 
 # 1. Load dữ liệu và kết quả từ Bước 2.1
-with open('./data/pkl/train_test_data.pkl', 'rb') as f:
-    data = pickle.load(f)
+data = load_split('./data/split', parts=('X_train', 'y_train'))
 
 X_train = data['X_train']
 y_train = data['y_train']
 feature_names = data['feature_names']
 
 # Load clean movies data để có thêm context
-movies_df = pd.read_csv('./data/clean_movies_with_labels.csv')
+movies_df = read_csv('./data/clean_movies_with_labels.csv')
 
 print(f"Dataset: {len(movies_df)} phim, {len(feature_names)} features")
 
@@ -9,22 +9,25 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.ensemble import RandomForestClassifier
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from pipeline.split_store import load_split
 
 print("=== Bước 2.1: Feature Importance Visualization ===")
 
 # 1. Load dữ liệu và model từ tuần 5
-data_path = './data/pkl/train_test_data.pkl'
+data_path = './data/split'
 model_path = './data/pkl/optimized_rf_model.pkl'
 
-if not os.path.exists(data_path):
+if not os.path.exists(os.path.join(data_path, 'manifest.json')):
     raise FileNotFoundError(f"File {data_path} không tồn tại. Hãy chạy data preparation trước.")
 
 if not os.path.exists(model_path):
     raise FileNotFoundError(f"File {model_path} không tồn tại. Hãy chạy hyperparameter tuning trước.")
 
 # Load data và model
-with open(data_path, 'rb') as f:
-    data = pickle.load(f)
+data = load_split(data_path)
 
 with open(model_path, 'rb') as f:
     model_data = pickle.load(f)
@@ -0,0 +1,284 @@
+"""
+Forest Compression cho Pre-Release Model
+========================================
+Thu nhỏ Random Forest đang serving (100 cây, depth <= 10) để giảm độ trễ
+dự đoán và kích thước artifact, với điều kiện accuracy out-of-bag (OOB) trên
+tập train không giảm quá --max-drop điểm phần trăm.
+
+Hai họ ứng viên:
+- subset_k: chọn k cây của forest gốc (greedy forward selection để trung bình
+  xác suất của k cây bám sát forest đầy đủ trên tập train - không dùng nhãn test).
+- distilled_n_d: forest nhỏ hơn (n cây, depth d) train lại trên nhãn do forest
+  gốc dự đoán cho tập train (distillation).
+
+Ứng viên được CHỌN theo accuracy OOB: mỗi dòng train chỉ được vote bởi các cây
+không thấy nó lúc bootstrap, so với forest gốc trên cùng các dòng. Test set
+(cùng split 80/20 với retrain.py) chỉ dùng để BÁO CÁO accuracy/F1 nên không bị
+lệch theo hướng có lợi cho ứng viên được chọn. Kèm độ trễ predict_proba 1 dòng,
+kích thước pickle, Pareto front latency/accuracy (test) và báo cáo CSV.
+
+Chạy:
+    python progress/week07/compress_forest.py [--max-drop 0.5] [--register]
+"""
+
+import argparse
+import copy
+import inspect
+import pickle
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble._forest import _generate_unsampled_indices
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import train_test_split
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+sys.path.append(str(Path(__file__).resolve().parent))  # retrain.py cùng thư mục, chạy được từ mọi cwd
+from pipeline.registry import ModelRegistry, file_sha256
+from retrain import load_data, select_features
+
+SUBSET_SIZES = (5, 10, 15, 20, 30, 40, 50, 75)
+DISTILL_GRID = [(n, d) for n in (10, 20, 40) for d in (6, 8, 10)]
+
+
+def greedy_tree_order(model, X: np.ndarray) -> list:
+    """
+    Thứ tự thêm cây (greedy forward selection): mỗi bước chọn cây làm trung bình
+    xác suất của các cây đã chọn gần forest đầy đủ nhất (MSE trên X).
+    Prefix k phần tử đầu là subset k cây tốt nhất theo greedy.
+    """
+    tree_probs = np.stack([tree.predict_proba(X)[:, 1] for tree in model.estimators_])
+    target = tree_probs.mean(axis=0)
+
+    order = []
+    remaining = list(range(len(tree_probs)))
+    running_sum = np.zeros(X.shape[0])
+    for k in range(1, len(tree_probs) + 1):
+        candidate_means = (running_sum + tree_probs[remaining]) / k
+        errors = ((candidate_means - target) ** 2).mean(axis=1)
+        best = remaining.pop(int(errors.argmin()))
+        order.append(best)
+        running_sum += tree_probs[best]
+    return order
+
+
+def subset_forest(model, tree_indices: list):
+    """Forest mới chỉ gồm các cây được chọn (predict_proba = trung bình các cây này)."""
+    subset = copy.deepcopy(model)
+    subset.estimators_ = [subset.estimators_[i] for i in tree_indices]
+    subset.n_estimators = len(tree_indices)
+    return subset
+
+
+def oob_masks(model, n_samples: int) -> np.ndarray:
+    """
+    (n_trees, n_samples): True nếu dòng train là out-of-bag của cây, tái tạo
+    bootstrap lúc fit từ random_state của từng cây (như oob_score_ của sklearn).
+    """
+    n_bootstrap = getattr(model, '_n_samples_bootstrap', None) or n_samples
+    # sklearn mới rút bootstrap theo sample_weight đã lưu khi fit; bản cũ không có tham số này
+    weighted = 'sample_weight' in inspect.signature(_generate_unsampled_indices).parameters
+    masks = np.zeros((len(model.estimators_), n_samples), dtype=bool)
+    for i, tree in enumerate(model.estimators_):
+        args = (tree.random_state, n_samples, n_bootstrap)
+        if weighted:
+            args += (getattr(model, '_sample_weight', None),)
+        masks[i, _generate_unsampled_indices(*args)] = True
+    return masks
+
+
+def oob_predict(model, X: np.ndarray, masks: np.ndarray) -> tuple:
+    """Dự đoán OOB: (nhãn, dòng có ít nhất một cây OOB)."""
+    votes = np.zeros((X.shape[0], len(model.classes_)))
+    for tree, mask in zip(model.estimators_, masks):
+        if mask.any():
+            votes[mask] += tree.predict_proba(X[mask])
+    return model.classes_[votes.argmax(axis=1)], masks.any(axis=0)
+
+
+def measure_latency(model, row: np.ndarray, repeats: int = 200) -> float:
+    """Median độ trễ predict_proba cho 1 dòng (ms)."""
+    model.predict_proba(row)  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def oob_delta(model, masks, X_train, y_train, baseline_oob: tuple) -> dict:
+    """Accuracy OOB của ứng viên và chênh lệch so với forest gốc trên các dòng cả hai cùng có vote."""
+    y_pred, covered = oob_predict(model, X_train, masks)
+    baseline_pred, baseline_covered = baseline_oob
+    common = covered & baseline_covered
+    accuracy = accuracy_score(y_train[common], y_pred[common])
+    return {
+        'oob_accuracy': accuracy,
+        'oob_delta_pt': (accuracy - accuracy_score(y_train[common], baseline_pred[common])) * 100,
+        'oob_coverage': common.mean(),
+    }
+
+
+def evaluate(name: str, model, X_test, y_test, baseline_accuracy: float = None) -> dict:
+    y_pred = model.predict(X_test)
+    accuracy = accuracy_score(y_test, y_pred)
+    return {
+        'candidate': name,
+        'n_trees': len(model.estimators_),
+        'max_depth': max(tree.tree_.max_depth for tree in model.estimators_),
+        'n_nodes': sum(tree.tree_.node_count for tree in model.estimators_),
+        'accuracy': accuracy,
+        'accuracy_delta_pt': (accuracy - baseline_accuracy) * 100 if baseline_accuracy is not None else 0.0,
+        'f1_score': f1_score(y_test, y_pred),
+        'latency_ms': measure_latency(model, X_test[:1]),
+        'size_kb': len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)) / 1024,
+    }
+
+
+def pareto_front(report: pd.DataFrame) -> pd.Series:
+    """True cho ứng viên không bị ứng viên nào khác vừa nhanh hơn vừa chính xác hơn."""
+    on_front = []
+    for _, row in report.iterrows():
+        dominated = (
+            (report['latency_ms'] <= row['latency_ms']) & (report['accuracy'] >= row['accuracy'])
+            & ((report['latency_ms'] < row['latency_ms']) | (report['accuracy'] > row['accuracy']))
+        ).any()
+        on_front.append(not dominated)
+    return pd.Series(on_front, index=report.index)
+
+
+def compress(model, X_train, y_train, X_test, y_test, max_drop: float = 0.5,
+             random_state: int = 42) -> tuple:
+    """
+    Sinh và đánh giá các ứng viên; trả về (report, {tên: model}, tên ứng viên được chọn).
+    Ứng viên được chọn: nhanh nhất trong các ứng viên có accuracy OOB giảm <= max_drop
+    điểm; test set chỉ dùng để báo cáo.
+    """
+    y_train = np.asarray(y_train)
+    # Đo trên 1 process: với 1 dòng, overhead thread pool (n_jobs=-1) lớn hơn thời gian duyệt cây
+    baseline = copy.deepcopy(model).set_params(n_jobs=None)
+    baseline_accuracy = accuracy_score(y_test, baseline.predict(X_test))
+    candidates = {'full': baseline}
+    baseline_masks = oob_masks(baseline, len(X_train))
+    masks = {'full': baseline_masks}
+
+    order = greedy_tree_order(baseline, X_train)
+    for k in SUBSET_SIZES:
+        if k < len(order):
+            candidates[f'subset_{k}'] = subset_forest(baseline, order[:k])
+            masks[f'subset_{k}'] = baseline_masks[order[:k]]
+
+    teacher_labels = baseline.predict(X_train)
+    for n_trees, depth in DISTILL_GRID:
+        student = RandomForestClassifier(
+            n_estimators=n_trees, max_depth=depth,
+            min_samples_split=baseline.min_samples_split, min_samples_leaf=baseline.min_samples_leaf,
+            class_weight=baseline.class_weight, random_state=random_state
+        )
+        name = f'distilled_{n_trees}_{depth}'
+        candidates[name] = student.fit(X_train, teacher_labels)
+        masks[name] = oob_masks(student, len(X_train))
+
+    baseline_oob = oob_predict(baseline, X_train, baseline_masks)
+    rows = [{**evaluate(name, candidate, X_test, y_test, baseline_accuracy),
+             **oob_delta(candidate, masks[name], X_train, y_train, baseline_oob)}
+            for name, candidate in candidates.items()]
+    report = pd.DataFrame(rows).set_index('candidate')
+    report['pareto'] = pareto_front(report)
+
+    eligible = report[report['oob_delta_pt'] >= -max_drop]
+    selected = eligible['latency_ms'].idxmin()
+    return report, candidates, selected
+
+
+def main(max_drop: float = 0.5, register: bool = False, role: str = 'pre_release_compact',
+         activate: bool = False):
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent.parent
+    data_path = project_root / 'data' / 'clean_movies_features.csv'
+    output_dir = script_dir / 'output'
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    registry = ModelRegistry(project_root / 'data' / 'registry')
+    digest = registry.active_digest('pre_release')
+    artifact = registry.load('pre_release')
+    model, scaler, feature_names = artifact['model'], artifact['scaler'], artifact['feature_names']
+    print(f"Forest gốc: registry pre_release -> {digest[:12]} "
+          f"({len(model.estimators_)} cây, {len(feature_names)} features)")
+
+    data_hash = file_sha256(data_path)
+    if registry.manifest(digest).get('data_hash') not in (None, data_hash):
+        print("⚠️  clean_movies_features.csv khác dữ liệu đã dùng để train model, kết quả test chỉ mang tính tham khảo")
+
+    # Tái tạo đúng split 80/20 của retrain.py
+    X, y, _ = select_features(load_data(str(data_path)))
+    X_train, X_test, y_train, y_test = train_test_split(
+        X[feature_names], y, test_size=0.2, random_state=42, stratify=y
+    )
+    X_train = scaler.transform(X_train)
+    X_test = scaler.transform(X_test)
+    y_test = np.asarray(y_test)
+
+    report, candidates, selected = compress(model, X_train, y_train, X_test, y_test, max_drop=max_drop)
+
+    report_path = output_dir / 'forest_compression.csv'
+    report.to_csv(report_path, float_format='%.4f')
+
+    print("\n=== Latency / Accuracy (test set) ===")
+    print(report.sort_values('latency_ms').to_string(float_format=lambda v: f'{v:.4f}'))
+    print("\nPareto front:")
+    for name, row in report[report['pareto']].sort_values('latency_ms').iterrows():
+        print(f"  {name:<16} {row['latency_ms']:7.3f} ms  acc={row['accuracy']:.4f} "
+              f"({row['accuracy_delta_pt']:+.2f} pt)  {row['size_kb']:.0f} KB")
+
+    full, best = report.loc['full'], report.loc[selected]
+    print(f"\nỨng viên được chọn (accuracy OOB giảm <= {max_drop} pt): {selected}")
+    print(f"  Độ trễ: {full['latency_ms']:.3f} -> {best['latency_ms']:.3f} ms "
+          f"(x{full['latency_ms'] / best['latency_ms']:.1f})")
+    print(f"  Kích thước: {full['size_kb']:.0f} -> {best['size_kb']:.0f} KB")
+    print(f"  Accuracy OOB (chọn): {full['oob_accuracy']:.4f} -> {best['oob_accuracy']:.4f} "
+          f"({best['oob_delta_pt']:+.2f} pt)")
+    print(f"  Accuracy test (chỉ báo cáo): {full['accuracy']:.4f} -> {best['accuracy']:.4f}")
+    print(f"Báo cáo: {report_path}")
+
+    if register and selected != 'full':
+        metrics = {
+            'accuracy': best['accuracy'],
+            'f1_score': best['f1_score'],
+            'latency_ms': best['latency_ms'],
+            'teacher_digest': digest,
+        }
+        compact_digest = registry.put({
+            'model': candidates[selected],
+            'scaler': scaler,
+            'feature_names': feature_names,
+            'metrics': metrics,
+            'model_type': role,
+            'description': f'Forest thu nhỏ ({selected}) từ pre_release {digest[:12]}'
+        }, role, metrics=metrics, feature_names=feature_names, data_hash=data_hash,
+            model_type=type(candidates[selected]).__name__, compression=selected)
+        registry.activate(role, compact_digest)
+        print(f"Registry role '{role}' -> {compact_digest[:12]}")
+        if activate:
+            registry.activate('pre_release', compact_digest)
+            print(f"Registry role 'pre_release' -> {compact_digest[:12]}")
+
+    return report, selected
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Thu nhỏ Pre-Release Random Forest theo latency/accuracy")
+    parser.add_argument('--max-drop', type=float, default=0.5,
+                        help="Accuracy OOB được phép giảm tối đa (điểm phần trăm)")
+    parser.add_argument('--register', action='store_true',
+                        help="Lưu ứng viên được chọn vào registry (role --role)")
+    parser.add_argument('--role', default='pre_release_compact')
+    parser.add_argument('--activate', action='store_true',
+                        help="Trỏ luôn role 'pre_release' (web app) sang model thu nhỏ")
+    args = parser.parse_args()
+    main(max_drop=args.max_drop, register=args.register, role=args.role, activate=args.activate)
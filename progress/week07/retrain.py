@@ -8,19 +8,28 @@ Author: Team Do An
 Date: 2024
 """
 
+import sys
+import time
+import argparse
 import pandas as pd
 import numpy as np
 import pickle
 import logging
 from pathlib import Path
 from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.inspection import permutation_importance
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score,
     classification_report, confusion_matrix
 )
 
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from pipeline.schema import read_csv
+from pipeline.registry import ModelRegistry, file_sha256
+from pipeline.drift import build_baseline
+
 # Cấu hình logging - log ra cả console và file
 def setup_logging(log_file: str) -> logging.Logger:
     """Setup logging to both console and file."""
@@ -94,10 +103,56 @@ PRE_RELEASE_FEATURES = [
 ]
 
 
+# ============================================
+# TRAINERS (cùng contract: estimator sklearn có fit/predict/predict_proba)
+# ============================================
+
+def build_random_forest() -> RandomForestClassifier:
+    """Random Forest mặc định của Pre-Release model."""
+    return RandomForestClassifier(
+        n_estimators=100,
+        max_depth=10,
+        min_samples_split=5,
+        min_samples_leaf=2,
+        random_state=42,
+        n_jobs=-1,
+        class_weight='balanced',  # Xử lý class imbalance
+        oob_score=True  # OOB predictions để đánh giá mà không cần train lại
+    )
+
+
+def build_hist_gradient_boosting() -> HistGradientBoostingClassifier:
+    """
+    Gradient boosting trên features đã chia bin (histogram, tối đa 255 bin/feature).
+    Chi phí tìm split theo số bin thay vì số mẫu -> phù hợp khi dữ liệu lên hàng chục nghìn phim;
+    cây nông (max_leaf_nodes=15) và dừng sớm theo validation nên ít cây hơn forest.
+    """
+    return HistGradientBoostingClassifier(
+        learning_rate=0.1,
+        max_iter=200,
+        max_leaf_nodes=15,
+        min_samples_leaf=20,
+        l2_regularization=1.0,
+        class_weight='balanced',
+        early_stopping=True,
+        validation_fraction=0.15,
+        n_iter_no_change=10,
+        random_state=42
+    )
+
+
+TRAINERS = {
+    'random_forest': build_random_forest,
+    'hist_gb': build_hist_gradient_boosting,
+}
+
+
 def load_data(filepath: str) -> pd.DataFrame:
     """Load dataset từ CSV file."""
     logger.info(f"Đang load data từ: {filepath}")
-    df = pd.read_csv(filepath)
+    # Chỉ đọc các cột cần cho training, dtype theo pipeline.schema
+    wanted = set(PRE_RELEASE_FEATURES) | {'success'}
+    df = read_csv(filepath, usecols=lambda column: column in wanted)
     logger.info(f"Loaded {len(df)} phim với {len(df.columns)} cột")
     return df
 
@@ -144,9 +199,61 @@ def select_features(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series, list]:
     return X, y, available_features
 
 
-def train_model(X: pd.DataFrame, y: pd.Series) -> tuple:
+def bootstrap_ci(y_true: np.ndarray, y_pred: np.ndarray, n_boot: int = 1000,
+                 alpha: float = 0.05, random_state: int = 42) -> dict:
+    """
+    Bootstrap confidence interval cho Accuracy và F1 (vectorized).
+    Resample (y_true, y_pred) n_boot lần, lấy percentile alpha/2 và 1-alpha/2.
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    y_pred = np.asarray(y_pred).astype(bool)
+    rng = np.random.RandomState(random_state)
+    idx = rng.randint(0, len(y_true), size=(n_boot, len(y_true)))
+    t, p = y_true[idx], y_pred[idx]
+
+    accuracy = (t == p).mean(axis=1)
+    tp = (t & p).sum(axis=1)
+    fp = (~t & p).sum(axis=1)
+    fn = (t & ~p).sum(axis=1)
+    denom = 2 * tp + fp + fn
+    f1 = np.divide(2 * tp, denom, out=np.zeros(n_boot), where=denom > 0)
+
+    q = [100 * alpha / 2, 100 * (1 - alpha / 2)]
+    return {
+        'accuracy': tuple(float(v) for v in np.percentile(accuracy, q)),
+        'f1_score': tuple(float(v) for v in np.percentile(f1, q)),
+    }
+
+
+def oob_evaluation(model, y_train: pd.Series) -> dict:
+    """
+    Đánh giá bằng Out-of-Bag predictions của forest đã fit (không train thêm model).
+    Mỗi mẫu train được dự đoán bởi các cây không thấy nó trong bootstrap sample.
+    """
+    decision = model.oob_decision_function_
+    # Mẫu chưa từng là OOB (rất hiếm với 100 cây) có giá trị NaN -> bỏ qua
+    valid = ~np.isnan(decision).any(axis=1)
+    y_true = np.asarray(y_train)[valid]
+    y_pred = model.classes_[decision[valid].argmax(axis=1)]
+
+    ci = bootstrap_ci(y_true, y_pred)
+    return {
+        'oob_accuracy': accuracy_score(y_true, y_pred),
+        'oob_f1': f1_score(y_true, y_pred),
+        'oob_accuracy_ci': ci['accuracy'],
+        'oob_f1_ci': ci['f1_score'],
+        'oob_samples': int(valid.sum()),
+    }
+
+
+def train_model(X: pd.DataFrame, y: pd.Series, run_cv: bool = False,
+                trainer: str = 'random_forest') -> tuple:
     """
-    Train Random Forest model với cross-validation.
+    Train model, đánh giá trên test set + OOB (Random Forest) hoặc thêm 5-fold CV.
+
+    Args:
+        run_cv: True -> chạy thêm 5-fold cross-validation (train thêm 5 model)
+        trainer: Tên trainer trong TRAINERS ('random_forest', 'hist_gb')
     
     Returns:
         model: Trained model
@@ -166,19 +273,13 @@ def train_model(X: pd.DataFrame, y: pd.Series) -> tuple:
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
     
-    # Train Random Forest
-    model = RandomForestClassifier(
-        n_estimators=100,
-        max_depth=10,
-        min_samples_split=5,
-        min_samples_leaf=2,
-        random_state=42,
-        n_jobs=-1,
-        class_weight='balanced'  # Xử lý class imbalance
-    )
+    # Train model theo trainer được chọn
+    model = TRAINERS[trainer]()
     
+    start = time.perf_counter()
     model.fit(X_train_scaled, y_train)
-    logger.info("Model đã train xong!")
+    train_time = time.perf_counter() - start
+    logger.info(f"Model ({trainer}) đã train xong sau {train_time:.2f}s!")
     
     # Predictions
     y_pred = model.predict(X_test_scaled)
@@ -210,32 +311,66 @@ def train_model(X: pd.DataFrame, y: pd.Series) -> tuple:
     logger.info(f"  TN={cm[0,0]}, FP={cm[0,1]}")
     logger.info(f"  FN={cm[1,0]}, TP={cm[1,1]}")
     
-    # Cross-validation
-    logger.info("\n" + "=" * 50)
-    logger.info("5-FOLD CROSS VALIDATION")
-    logger.info("=" * 50)
-    
-    cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
-    cv_scores = cross_val_score(model, scaler.transform(X), y, cv=cv, scoring='accuracy')
-    
-    metrics['cv_mean'] = cv_scores.mean()
-    metrics['cv_std'] = cv_scores.std()
-    
-    logger.info(f"CV Scores: {cv_scores}")
-    logger.info(f"CV Mean:   {cv_scores.mean():.4f} (+/- {cv_scores.std()*2:.4f})")
+    metrics['trainer'] = trainer
+    metrics['train_time'] = train_time
+    metrics['evaluation'] = 'holdout'
+    
+    # Out-of-Bag evaluation (từ chính forest đã train, chỉ có ở Random Forest)
+    if hasattr(model, 'oob_decision_function_'):
+        logger.info("\n" + "=" * 50)
+        logger.info("OUT-OF-BAG EVALUATION")
+        logger.info("=" * 50)
+        
+        metrics.update(oob_evaluation(model, y_train))
+        metrics['evaluation'] = 'oob'
+        
+        low, high = metrics['oob_accuracy_ci']
+        logger.info(f"OOB Accuracy: {metrics['oob_accuracy']:.4f} (95% CI: {low:.4f} - {high:.4f})")
+        low, high = metrics['oob_f1_ci']
+        logger.info(f"OOB F1-Score: {metrics['oob_f1']:.4f} (95% CI: {low:.4f} - {high:.4f})")
+    elif hasattr(model, 'n_iter_'):
+        logger.info(f"Số vòng boosting (early stopping): {model.n_iter_}")
+        metrics['n_iter'] = int(model.n_iter_)
+    
+    # Model không có feature_importances_ (vd. HistGradientBoosting) -> permutation importance trên test set
+    if not hasattr(model, 'feature_importances_'):
+        result = permutation_importance(model, X_test_scaled, y_test, scoring='accuracy',
+                                        n_repeats=5, random_state=42)
+        metrics['feature_importances'] = dict(zip(X.columns, result.importances_mean.tolist()))
+    
+    # Cross-validation (chỉ khi được yêu cầu)
+    if run_cv:
+        logger.info("\n" + "=" * 50)
+        logger.info("5-FOLD CROSS VALIDATION")
+        logger.info("=" * 50)
+        
+        cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+        cv_scores = cross_val_score(model, scaler.transform(X), y, cv=cv, scoring='accuracy')
+        
+        metrics['cv_mean'] = cv_scores.mean()
+        metrics['cv_std'] = cv_scores.std()
+        metrics['evaluation'] += '+cv'
+        
+        logger.info(f"CV Scores: {cv_scores}")
+        logger.info(f"CV Mean:   {cv_scores.mean():.4f} (+/- {cv_scores.std()*2:.4f})")
     
     return model, scaler, metrics, X.columns.tolist()
 
 
-def analyze_feature_importance(model, feature_names: list) -> pd.DataFrame:
-    """Phân tích Feature Importance."""
+def analyze_feature_importance(model, feature_names: list, metrics: dict = None) -> pd.DataFrame:
+    """Phân tích Feature Importance (permutation importance trong metrics nếu model không có sẵn)."""
     logger.info("\n" + "=" * 50)
     logger.info("FEATURE IMPORTANCE")
     logger.info("=" * 50)
     
+    if hasattr(model, 'feature_importances_'):
+        importances = model.feature_importances_
+    else:
+        importances = [metrics['feature_importances'][name] for name in feature_names]
+    
     importance_df = pd.DataFrame({
         'feature': feature_names,
-        'importance': model.feature_importances_
+        'importance': importances
     }).sort_values('importance', ascending=False)
     
     # Top 15 features
@@ -246,27 +381,89 @@ def analyze_feature_importance(model, feature_names: list) -> pd.DataFrame:
     return importance_df
 
 
-def save_model(model, scaler, feature_names: list, metrics: dict, output_dir: str) -> None:
-    """Lưu model và metadata."""
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
-    
-    # Save model
-    model_path = output_path / 'pre_release_rf_model.pkl'
-    with open(model_path, 'wb') as f:
-        pickle.dump({
-            'model': model,
-            'scaler': scaler,
-            'feature_names': feature_names,
-            'metrics': metrics,
-            'model_type': 'pre_release',
-            'description': 'Random Forest model cho Pre-Release Prediction (không có data leakage)'
-        }, f)
-    
-    logger.info(f"\nModel đã lưu tại: {model_path}")
+def save_model(model, scaler, feature_names: list, metrics: dict, registry_dir: str,
+               data_hash: str = None, role: str = 'pre_release', drift_baseline: dict = None) -> str:
+    """
+    Lưu model và metadata vào model registry (content-addressed) và
+    chuyển con trỏ active của role sang artifact mới.
 
+    Returns:
+        digest: SHA-256 của artifact
+    """
+    registry = ModelRegistry(registry_dir)
+    digest = registry.put({
+        'model': model,
+        'scaler': scaler,
+        'feature_names': feature_names,
+        'metrics': metrics,
+        'model_type': role,
+        'description': f'{type(model).__name__} model cho Pre-Release Prediction (không có data leakage)',
+        'drift_baseline': drift_baseline
+    }, role, metrics=metrics, feature_names=feature_names, data_hash=data_hash,
+        model_type=type(model).__name__)
+    registry.activate(role, digest)
+    
+    logger.info(f"\nModel đã lưu tại: {registry.object_path(digest)}")
+    logger.info(f"Registry role '{role}' -> {digest[:12]}")
+    return digest
+
+
+def _median_latency_ms(model, row: np.ndarray, repeats: int = 200) -> float:
+    """Median độ trễ predict_proba cho 1 dòng (ms)."""
+    model.predict_proba(row)  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def compare_trainers(X: pd.DataFrame, y: pd.Series, trainers: list = None,
+                     batch_rows: int = 20000) -> pd.DataFrame:
+    """
+    So sánh các trainer trên cùng split 80/20 và cùng scaler:
+    thời gian train, độ trễ 1 dòng, throughput theo batch và accuracy/F1 trên test set.
+    """
+    trainers = trainers or list(TRAINERS)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+    # Batch lớn giả lập dataset hàng chục nghìn phim (lặp lại test set)
+    X_batch = np.tile(X_test_scaled, (int(np.ceil(batch_rows / len(X_test_scaled))), 1))[:batch_rows]
+    
+    rows = []
+    for name in trainers:
+        model = TRAINERS[name]()
+        start = time.perf_counter()
+        model.fit(X_train_scaled, y_train)
+        train_time = time.perf_counter() - start
+        
+        y_pred = model.predict(X_test_scaled)
+        start = time.perf_counter()
+        model.predict_proba(X_batch)
+        batch_time = time.perf_counter() - start
+        
+        rows.append({
+            'trainer': name,
+            'model_type': type(model).__name__,
+            'n_trees': len(getattr(model, 'estimators_', [])) or int(getattr(model, 'n_iter_', 0)),
+            'train_time_s': train_time,
+            'latency_ms': _median_latency_ms(model, X_test_scaled[:1]),
+            'throughput_rows_s': batch_rows / batch_time,
+            'accuracy': accuracy_score(y_test, y_pred),
+            'f1_score': f1_score(y_test, y_pred),
+        })
+        logger.info(f"{name}: train {train_time:.2f}s, acc={rows[-1]['accuracy']:.4f}, "
+                    f"latency={rows[-1]['latency_ms']:.3f} ms, "
+                    f"throughput={rows[-1]['throughput_rows_s']:.0f} rows/s")
+    return pd.DataFrame(rows).set_index('trainer')
 
-def main():
+
+def main(run_cv: bool = False, trainer: str = 'random_forest', compare: bool = False):
     """Main function."""
     global logger
     
@@ -297,34 +494,51 @@ def main():
     # Select features
     X, y, feature_names = select_features(df)
     
+    # Chỉ so sánh các trainer, không lưu model
+    if compare:
+        logger.info("\n" + "=" * 50)
+        logger.info("SO SÁNH TRAINERS")
+        logger.info("=" * 50)
+        report = compare_trainers(X, y)
+        report_csv = output_dir / 'trainer_comparison.csv'
+        report.to_csv(report_csv, float_format='%.4f')
+        logger.info("\n" + report.to_string(float_format=lambda v: f'{v:.4f}'))
+        logger.info(f"Báo cáo so sánh: {report_csv}")
+        return report
+    
     # Train model
-    model, scaler, metrics, used_features = train_model(X, y)
+    model, scaler, metrics, used_features = train_model(X, y, run_cv=run_cv, trainer=trainer)
     
     # Feature importance
-    importance_df = analyze_feature_importance(model, used_features)
+    importance_df = analyze_feature_importance(model, used_features, metrics)
     
     # Save importance to CSV
     importance_csv = output_dir / 'feature_importance.csv'
     importance_df.to_csv(importance_csv, index=False)
     logger.info(f"Feature importance saved to: {importance_csv}")
     
-    # Save model to output dir
-    save_model(model, scaler, used_features, metrics, str(output_dir))
+    # Baseline phân phối features cho drift monitor của web app: features chưa scale
+    # của đúng các dòng train (cùng split 80/20 với train_model)
+    X_train, _, _, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    drift_baseline = build_baseline(X_train[used_features])
     
-    # Also save to data/pkl for web app
-    pkl_dir = project_root / 'data' / 'pkl'
-    pkl_dir.mkdir(parents=True, exist_ok=True)
-    save_model(model, scaler, used_features, metrics, str(pkl_dir))
+    # Save model vào registry (web app resolve qua con trỏ active, không copy file)
+    registry_dir = project_root / 'data' / 'registry'
+    save_model(model, scaler, used_features, metrics, str(registry_dir),
+               data_hash=file_sha256(data_path), drift_baseline=drift_baseline)
     
     # Summary
     logger.info("\n" + "=" * 60)
     logger.info("SUMMARY")
     logger.info("=" * 60)
-    logger.info(f"✅ Model type: Pre-Release Prediction")
+    logger.info(f"✅ Model type: Pre-Release Prediction ({trainer})")
     logger.info(f"✅ Features used: {len(used_features)}")
     logger.info(f"✅ Accuracy: {metrics['accuracy']*100:.2f}%")
     logger.info(f"✅ F1-Score: {metrics['f1_score']*100:.2f}%")
-    logger.info(f"✅ CV Mean: {metrics['cv_mean']*100:.2f}%")
+    if 'oob_accuracy' in metrics:
+        logger.info(f"✅ OOB Accuracy: {metrics['oob_accuracy']*100:.2f}%")
+    if 'cv_mean' in metrics:
+        logger.info(f"✅ CV Mean: {metrics['cv_mean']*100:.2f}%")
     logger.info(f"✅ Output directory: {output_dir}")
     logger.info(f"✅ Log file: {log_file}")
     logger.info("=" * 60)
@@ -333,5 +547,13 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Train Pre-Release model")
+    parser.add_argument('--cv', action='store_true',
+                        help="Chạy thêm 5-fold cross-validation (mặc định chỉ dùng OOB)")
+    parser.add_argument('--trainer', choices=sorted(TRAINERS), default='random_forest',
+                        help="Thuật toán train (mặc định Random Forest)")
+    parser.add_argument('--compare', action='store_true',
+                        help="So sánh các trainer (thời gian train, latency, throughput, accuracy), không lưu model")
+    args = parser.parse_args()
+    main(run_cv=args.cv, trainer=args.trainer, compare=args.compare)
 
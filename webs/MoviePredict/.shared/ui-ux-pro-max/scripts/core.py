@@ -5,13 +5,29 @@ UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
 import csv
+import hashlib
+import heapq
+import os
+import pickle
 import re
+import tempfile
+import threading
 from pathlib import Path
 from math import log
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # Optional: batch search falls back to the inverted index
+    np = sparse = None
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
+INDEX_DIR = DATA_DIR / ".index"
+INDEX_VERSION = 2
 MAX_RESULTS = 3
 
 CSV_CONFIG = {
@@ -77,9 +93,20 @@ _STACK_COLS = {
 AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
 
+# ============ TOKENIZER ============
+_NON_WORD = re.compile(r'[^\w\s]')
+
+
+@lru_cache(maxsize=4096)
+def tokenize(text):
+    """Lowercase, split, remove punctuation, filter short words (cached, shared by all indexes)"""
+    text = _NON_WORD.sub(' ', str(text).lower())
+    return tuple(w for w in text.split() if len(w) > 2)
+
+
 # ============ BM25 IMPLEMENTATION ============
 class BM25:
-    """BM25 ranking algorithm for text search"""
+    """BM25 ranking algorithm for text search (inverted index)"""
 
     def __init__(self, k1=1.5, b=0.75):
         self.k1 = k1
@@ -89,12 +116,12 @@ class BM25:
         self.avgdl = 0
         self.idf = {}
         self.doc_freqs = defaultdict(int)
+        self.postings = {}
         self.N = 0
 
     def tokenize(self, text):
         """Lowercase, split, remove punctuation, filter short words"""
-        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
-        return [w for w in text.split() if len(w) > 2]
+        return list(tokenize(text))
 
     def fit(self, documents):
         """Build BM25 index from documents"""
@@ -105,66 +132,259 @@ class BM25:
         self.doc_lengths = [len(doc) for doc in self.corpus]
         self.avgdl = sum(self.doc_lengths) / self.N
 
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
+        # Posting lists: term -> [(doc id, tf)] in doc id order
+        postings = defaultdict(list)
+        for idx, doc in enumerate(self.corpus):
+            for word, tf in Counter(doc).items():
+                postings[word].append((idx, tf))
+        self.postings = dict(postings)
+
+        for word, docs in self.postings.items():
+            self.doc_freqs[word] = len(docs)
 
         for word, freq in self.doc_freqs.items():
             self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
 
+    def _accumulate(self, query):
+        """Scores of documents containing at least one query token: {doc id: score}"""
+        return self._accumulate_tokens(tokenize(query))
+
+    def _accumulate_tokens(self, tokens):
+        scores = {}
+        for token in tokens:
+            if token not in self.idf:
+                continue
+            idf = self.idf[token]
+            numerator_factor = self.k1 + 1
+            for idx, tf in self.postings[token]:
+                numerator = tf * numerator_factor
+                denominator = tf + self.k1 * (1 - self.b + self.b * self.doc_lengths[idx] / self.avgdl)
+                scores[idx] = scores.get(idx, 0) + idf * numerator / denominator
+        return scores
+
     def score(self, query):
         """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
+        scores = self._accumulate(query)
+        ranked = [(idx, scores.get(idx, 0)) for idx in range(self.N)]
+        return sorted(ranked, key=lambda x: x[1], reverse=True)
+
+    def top_k(self, query, k):
+        """
+        Top k (doc id, score) with score > 0, same order as score()[:k]:
+        only matching postings are scored and a bounded heap selects the top k.
+        """
+        return self.top_k_tokens(tokenize(query), k)
+
+    def top_k_tokens(self, tokens, k):
+        """top_k() for an already tokenized query"""
+        scores = self._accumulate_tokens(tokens)
+        # Ties keep the lower doc id first, like the stable sort in score()
+        return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+
+    def max_score(self, tokens):
+        """
+        Upper bound of a document score for these tokens (tf -> infinity), used to
+        normalize scores across indexes. Tokens missing from this corpus count with
+        the idf of an unseen term, so a corpus that lacks query terms scores lower.
+        """
+        unseen_idf = log((self.N + 0.5) / 0.5 + 1)
+        return sum(self.idf.get(token, unseen_idf) for token in tokens) * (self.k1 + 1)
+
+    def state(self):
+        """Fitted index as plain builtins (safe to pickle independently of this module)"""
+        return {
+            "k1": self.k1, "b": self.b, "corpus": self.corpus, "doc_lengths": self.doc_lengths,
+            "avgdl": self.avgdl, "idf": self.idf, "postings": self.postings, "N": self.N
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a fitted BM25 from state() without re-tokenizing"""
+        bm25 = cls(k1=state["k1"], b=state["b"])
+        bm25.corpus = state["corpus"]
+        bm25.doc_lengths = state["doc_lengths"]
+        bm25.avgdl = state["avgdl"]
+        bm25.idf = state["idf"]
+        bm25.postings = state["postings"]
+        bm25.doc_freqs = defaultdict(int, {word: len(docs) for word, docs in bm25.postings.items()})
+        bm25.N = state["N"]
+        return bm25
+
+
+class SparseBM25:
+    """
+    Batch BM25 backend: the corpus as a sparse doc-term matrix of precomputed
+    BM25 weights, so a whole batch of queries is scored with one sparse product.
+    Requires numpy + scipy; built from an already fitted BM25.
+    """
+
+    def __init__(self, bm25):
+        self.bm25 = bm25
+        self.vocab = {word: col for col, word in enumerate(bm25.postings)}
+        rows, cols, weights = [], [], []
+        for word, col in self.vocab.items():
+            idf = bm25.idf[word]
+            for idx, tf in bm25.postings[word]:
+                denominator = tf + bm25.k1 * (1 - bm25.b + bm25.b * bm25.doc_lengths[idx] / bm25.avgdl)
+                rows.append(col)
+                cols.append(idx)
+                weights.append(idf * tf * (bm25.k1 + 1) / denominator)
+        # Stored term-major (V x N) so query_matrix @ weights gives (n_queries x N)
+        self.weights = sparse.csr_matrix((weights, (rows, cols)), shape=(len(self.vocab), bm25.N))
+
+    def query_matrix(self, queries):
+        """Token counts per query (repeated tokens count repeatedly, like BM25.score)"""
+        rows, cols = [], []
+        for row, query in enumerate(queries):
+            for token in self.bm25.tokenize(query):
+                col = self.vocab.get(token)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        counts = np.ones(len(rows))
+        return sparse.csr_matrix((counts, (rows, cols)), shape=(len(queries), len(self.vocab)))
+
+    def top_k_batch(self, queries, k):
+        """[(doc id, score)] with score > 0 per query, best first (ties: lower doc id first)"""
+        scores = (self.query_matrix(queries) @ self.weights).tocsr()
+        ranked = []
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            doc_ids, values = scores.indices[start:end], scores.data[start:end]
+            positive = values > 0
+            doc_ids, values = doc_ids[positive], values[positive]
+            order = np.lexsort((doc_ids, -values))[:k]
+            ranked.append([(int(doc_ids[i]), float(values[i])) for i in order])
+        return ranked
+
+
+# ============ CSV LOADING ============
+def _load_csv(filepath):
+    """Load CSV and return list of dicts"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
 
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
 
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
+# ============ PERSISTENT INDEX ============
+# Process-level cache: (csv path, search cols) -> {"signature", "rows", "bm25"[, "sparse"]}
+_INDEX_CACHE = {}
+# Guards lazy additions to a shared cache entry (search_all reads entries from a thread pool)
+_INDEX_LOCK = threading.Lock()
 
-            scores.append((idx, score))
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+def _file_signature(filepath):
+    stat = filepath.stat()
+    return stat.st_mtime_ns, stat.st_size
 
 
-# ============ SEARCH FUNCTIONS ============
-def _load_csv(filepath):
-    """Load CSV and return list of dicts"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return list(csv.DictReader(f))
+def _file_sha256(filepath):
+    return hashlib.sha256(filepath.read_bytes()).hexdigest()
 
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
-    if not filepath.exists():
-        return []
+def _index_path(filepath):
+    """data/stacks/react.csv -> data/.index/stacks__react.csv.pkl"""
+    try:
+        relative = filepath.resolve().relative_to(DATA_DIR.resolve())
+    except ValueError:
+        relative = Path(filepath.name)
+    return INDEX_DIR / (str(relative).replace(os.sep, "__") + ".pkl")
+
+
+def _write_index(path, payload):
+    """Atomic write (temp file + rename); a read-only data dir just means no disk cache"""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
 
+def _read_index(path):
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+
+
+def build_index(filepath, search_cols):
+    """Parse CSV, tokenize documents and fit BM25; returns the serializable index payload"""
     data = _load_csv(filepath)
 
     # Build documents from search columns
     documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
 
-    # BM25 search
     bm25 = BM25()
     bm25.fit(documents)
-    ranked = bm25.score(query)
+    return {
+        "version": INDEX_VERSION,
+        "search_cols": list(search_cols),
+        "signature": _file_signature(filepath),
+        "sha256": _file_sha256(filepath),
+        "rows": data,
+        "bm25": bm25.state()
+    }
+
+
+def load_index(filepath, search_cols):
+    """
+    Fitted BM25 + rows for a CSV, from the process cache, then the on-disk index,
+    rebuilding only when the CSV changed (mtime/size differ and content hash differs).
+    """
+    key = (str(filepath), tuple(search_cols))
+    signature = _file_signature(filepath)
+    cached = _INDEX_CACHE.get(key)
+    if cached and cached["signature"] == signature:
+        return cached
+
+    path = _index_path(filepath)
+    payload = _read_index(path)
+    valid = (isinstance(payload, dict) and payload.get("version") == INDEX_VERSION
+             and payload.get("search_cols") == list(search_cols))
+    if valid and payload["signature"] != signature:
+        # Touched but maybe not modified (checkout, copy): fall back to the content hash
+        valid = payload["sha256"] == _file_sha256(filepath)
+        if valid:
+            payload["signature"] = signature
+            _write_index(path, payload)
+    if not valid:
+        payload = build_index(filepath, search_cols)
+        _write_index(path, payload)
+
+    entry = {"signature": signature, "rows": payload["rows"], "bm25": BM25.from_state(payload["bm25"])}
+    _INDEX_CACHE[key] = entry
+    return entry
+
+
+def build_all_indexes():
+    """Prebuild the on-disk index of every domain and stack; returns the CSV files indexed"""
+    built = []
+    targets = [(config["file"], config["search_cols"]) for config in CSV_CONFIG.values()]
+    targets += [(config["file"], _STACK_COLS["search_cols"]) for config in STACK_CONFIG.values()]
+    for file, search_cols in targets:
+        filepath = DATA_DIR / file
+        if filepath.exists():
+            load_index(filepath, search_cols)
+            built.append(file)
+    return built
+
+
+# ============ SEARCH FUNCTIONS ============
+def _search_csv(filepath, search_cols, output_cols, query, max_results):
+    """Core search function using BM25"""
+    if not filepath.exists():
+        return []
+
+    index = load_index(filepath, search_cols)
+    data = index["rows"]
+    ranked = index["bm25"].top_k(query, max_results)
 
     # Get top results with score > 0
     results = []
-    for idx, score in ranked[:max_results]:
+    for idx, score in ranked:
         if score > 0:
             row = data[idx]
             results.append({col: row.get(col, "") for col in output_cols if col in row})
@@ -172,22 +392,92 @@ def _search_csv(filepath, search_cols, output_cols, query, max_results):
     return results
 
 
+def _batch_search_csv(filepath, search_cols, output_cols, queries, max_results):
+    """_search_csv for many queries at once (sparse backend, inverted index fallback)"""
+    if not filepath.exists():
+        return [[] for _ in queries]
+
+    index = load_index(filepath, search_cols)
+    data = index["rows"]
+    if sparse is not None:
+        with _INDEX_LOCK:
+            if "sparse" not in index:
+                index["sparse"] = SparseBM25(index["bm25"])
+        ranked_batch = index["sparse"].top_k_batch(queries, max_results)
+    else:
+        ranked_batch = [index["bm25"].top_k(query, max_results) for query in queries]
+
+    return [
+        [{col: data[idx].get(col, "") for col in output_cols if col in data[idx]} for idx, _ in ranked]
+        for ranked in ranked_batch
+    ]
+
+
+DOMAIN_KEYWORDS = {
+    "color": ["color", "palette", "hex", "#", "rgb"],
+    "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
+    "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
+    "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
+    "prompt": ["prompt", "css", "implementation", "variable", "checklist", "tailwind"],
+    "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora"],
+    "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
+    "typography": ["font", "typography", "heading", "serif", "sans"]
+}
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over all keywords: one pass over the text finds every
+    keyword occurring as a substring (overlaps included), like `kw in text` per keyword.
+    """
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [set()]
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(set())
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].add(keyword)
+
+        # Breadth-first failure links; each state inherits the outputs of its failure state
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] |= self.output[self.fail[child]]
+
+    def find(self, text):
+        """Set of keywords that occur in text"""
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            if self.output[state]:
+                found |= self.output[state]
+        return found
+
+
+_DOMAIN_MATCHER = KeywordMatcher({kw for keywords in DOMAIN_KEYWORDS.values() for kw in keywords})
+
+
 def detect_domain(query):
     """Auto-detect the most relevant domain from query"""
-    query_lower = query.lower()
-
-    domain_keywords = {
-        "color": ["color", "palette", "hex", "#", "rgb"],
-        "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
-        "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
-        "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
-        "prompt": ["prompt", "css", "implementation", "variable", "checklist", "tailwind"],
-        "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora"],
-        "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
-        "typography": ["font", "typography", "heading", "serif", "sans"]
-    }
-
-    scores = {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in domain_keywords.items()}
+    found = _DOMAIN_MATCHER.find(query.lower())
+    scores = {domain: sum(1 for kw in keywords if kw in found) for domain, keywords in DOMAIN_KEYWORDS.items()}
     best = max(scores, key=scores.get)
     return best if scores[best] > 0 else "style"
 
@@ -234,3 +524,99 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
         "count": len(results),
         "results": results
     }
+
+
+def search_batch(queries, domain=None, stack=None, max_results=MAX_RESULTS, chunk_size=256):
+    """
+    Run many queries, yielding one result dict per query (same format as
+    search()/search_stack()) in input order. Queries are processed in chunks;
+    within a chunk each domain/stack is scored with one sparse matrix product.
+    """
+    if stack is not None and stack not in STACK_CONFIG:
+        yield {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
+        return
+
+    chunk = []
+    for query in queries:
+        chunk.append(query)
+        if len(chunk) >= chunk_size:
+            yield from _search_chunk(chunk, domain, stack, max_results)
+            chunk = []
+    if chunk:
+        yield from _search_chunk(chunk, domain, stack, max_results)
+
+
+def _search_chunk(queries, domain, stack, max_results):
+    groups = defaultdict(list)
+    for position, query in enumerate(queries):
+        groups[stack or domain or detect_domain(query)].append(position)
+
+    results = [None] * len(queries)
+    for name, positions in groups.items():
+        if stack:
+            file, search_cols, output_cols = STACK_CONFIG[name]["file"], _STACK_COLS["search_cols"], _STACK_COLS["output_cols"]
+        else:
+            config = CSV_CONFIG.get(name, CSV_CONFIG["style"])
+            file, search_cols, output_cols = config["file"], config["search_cols"], config["output_cols"]
+        filepath = DATA_DIR / file
+        batch = [queries[position] for position in positions]
+
+        if not filepath.exists():
+            found = [{"error": f"File not found: {filepath}", "domain": name} for _ in batch]
+        else:
+            rows = _batch_search_csv(filepath, search_cols, output_cols, batch, max_results)
+            found = []
+            for query, query_results in zip(batch, rows):
+                result = {"domain": "stack", "stack": name} if stack else {"domain": name}
+                result.update({"query": query, "file": file, "count": len(query_results), "results": query_results})
+                found.append(result)
+        for position, result in zip(positions, found):
+            results[position] = result
+    return results
+
+
+def search_all(query, max_results=MAX_RESULTS, include_stacks=False, domains=None):
+    """
+    Fan-out search: tokenize the query once, score every domain's index (and every
+    stack's with include_stacks) concurrently and merge the hits by normalized score
+    (BM25 score / max_score of the query in that index, in [0, 1)).
+    """
+    unknown = [name for name in (domains or ()) if name not in CSV_CONFIG]
+    if unknown:
+        return {"error": f"Unknown domain: {', '.join(unknown)}. Available: {', '.join(CSV_CONFIG)}"}
+
+    tokens = tokenize(query)
+    targets = [(name, CSV_CONFIG[name]["file"], CSV_CONFIG[name]["search_cols"], CSV_CONFIG[name]["output_cols"])
+               for name in (domains or CSV_CONFIG)]
+    if include_stacks:
+        targets += [(f"stack:{name}", config["file"], _STACK_COLS["search_cols"], _STACK_COLS["output_cols"])
+                    for name, config in STACK_CONFIG.items()]
+    targets = [target for target in targets if (DATA_DIR / target[1]).exists()]
+
+    def score_target(target):
+        name, file, search_cols, output_cols = target
+        index = load_index(DATA_DIR / file, search_cols)
+        bm25 = index["bm25"]
+        norm = bm25.max_score(tokens) or 1
+        return [
+            {
+                "domain": name,
+                "file": file,
+                "score": round(score / norm, 4),
+                "result": {col: index["rows"][idx].get(col, "") for col in output_cols if col in index["rows"][idx]}
+            }
+            for idx, score in bm25.top_k_tokens(tokens, max_results)
+        ]
+
+    with ThreadPoolExecutor(max_workers=min(8, len(targets) or 1)) as pool:
+        hits = [hit for domain_hits in pool.map(score_target, targets) for hit in domain_hits]
+
+    # Stable sort: equal scores keep domain order
+    hits.sort(key=lambda hit: hit["score"], reverse=True)
+    return {
+        "domain": "all",
+        "query": query,
+        "domains": [target[0] for target in targets],
+        "count": len(hits[:max_results]),
+        "results": hits[:max_results]
+    }
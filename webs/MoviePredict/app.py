@@ -10,6 +10,8 @@ sys.path.append(project_root)
 
 # Import Pre-Release prediction service
 from models.pre_release_service import get_prediction_service
+from assets import ResponseCache, StaticAssets
+from pipeline.prediction_log import PredictionLogWriter
 
 app = Flask(__name__)
 
@@ -24,10 +26,25 @@ app.config['DEBUG'] = True
 # Get Pre-Release prediction service instance
 prediction_service = get_prediction_service()
 
+# Audit log mọi prediction (ghi nền, segment .npz trong data/prediction_log); PREDICTION_LOG=0 để tắt
+if os.environ.get('PREDICTION_LOG', '1') != '0':
+    prediction_service.prediction_log = PredictionLogWriter(
+        os.environ.get('PREDICTION_LOG_DIR', os.path.join(project_root, 'data', 'prediction_log')))
+
+# Fingerprinted bundles (tools/build_assets.py) + index.html/API JSON rendered once per model version
+static_assets = StaticAssets(app)
+response_cache = ResponseCache()
+
+def render_index(status=200):
+    accuracy = prediction_service.model_accuracy
+    return response_cache.respond('index', (prediction_service.model_version, accuracy),
+                                  lambda: render_template('index.html', model_accuracy=accuracy),
+                                  status=status)
+
 @app.route('/')
 def index():
     """Main page"""
-    return render_template('index.html', model_accuracy=prediction_service.model_accuracy)
+    return render_index()
 
 @app.route('/predict', methods=['POST'])
 def predict():
@@ -61,8 +78,17 @@ def predict():
         if 'releaseYear' not in data:
             data['releaseYear'] = datetime.now().year
         
+        try:
+            float(data['budget']), int(data['runtime']), int(data['releaseMonth']), int(data['releaseYear'])
+        except (TypeError, ValueError):
+            return jsonify({
+                'error': 'budget, runtime, releaseMonth and releaseYear must be numeric',
+                'success': False
+            }), 400
+        
         # Use Pre-Release prediction service
-        prediction_result = prediction_service.predict(data)
+        explain = str(request.args.get('explain', data.get('explain', False))).lower() in ('1', 'true', 'yes')
+        prediction_result = prediction_service.predict(data, explain=explain)
         
         # Prepare response
         response = {
@@ -89,6 +115,8 @@ def predict():
                 'note': 'Pre-Release prediction - chỉ dùng thông tin biết trước'
             }
         }
+        if explain:
+            response['explanation'] = prediction_result['explanation']
         
         return jsonify(response)
         
@@ -99,12 +127,147 @@ def predict():
             'success': False
         }), 500
 
-@app.route('/api/model-info')
-def model_info():
-    """Get information about the loaded Pre-Release model"""
-    return jsonify({
+@app.route('/optimize/release-window', methods=['POST'])
+def optimize_release_window():
+    """Rank all month × weekday release windows for one movie"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                'error': 'No data provided',
+                'success': False
+            }), 400
+        
+        if 'budget' not in data:
+            return jsonify({
+                'error': 'Missing required field: budget',
+                'success': False
+            }), 400
+        
+        try:
+            float(data['budget'])
+            month = int(data.get('releaseMonth', datetime.now().month))
+            weekday = int(data.get('releaseWeekday', 4))
+            top_n = int(request.args.get('top', 10))
+        except (TypeError, ValueError):
+            return jsonify({
+                'error': 'budget, releaseMonth, releaseWeekday and top must be numeric',
+                'success': False
+            }), 400
+        if not 1 <= month <= 12 or not 0 <= weekday <= 6:
+            return jsonify({
+                'error': 'releaseMonth must be 1-12 and releaseWeekday 0-6',
+                'success': False
+            }), 400
+        
+        result = prediction_service.optimize_release_window(data, top_n=max(1, min(top_n, 84)))
+        
+        return jsonify({
+            'success': True,
+            'title': data.get('title', 'Unknown'),
+            **result
+        })
+        
+    except Exception as e:
+        logger.exception(f"Lỗi khi tối ưu thời điểm phát hành: {e}")
+        return jsonify({
+            'error': f'Lỗi khi tối ưu thời điểm phát hành: {str(e)}',
+            'success': False
+        }), 500
+
+@app.route('/analyze/sensitivity', methods=['POST'])
+def analyze_sensitivity():
+    """Budget/runtime sensitivity curves for one movie"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                'error': 'No data provided',
+                'success': False
+            }), 400
+        
+        if 'budget' not in data:
+            return jsonify({
+                'error': 'Missing required field: budget',
+                'success': False
+            }), 400
+        
+        try:
+            float(data['budget'])
+            budget_range = [float(v) for v in data.get('budgetRange', [1e6, 3e8])]
+            runtime_range = [float(v) for v in data.get('runtimeRange', [60, 200])]
+            n_points = int(data.get('points', 50))
+        except (TypeError, ValueError):
+            return jsonify({
+                'error': 'budget, budgetRange, runtimeRange and points must be numeric',
+                'success': False
+            }), 400
+        if not (len(budget_range) == 2 and len(runtime_range) == 2
+                and 0 < budget_range[0] < budget_range[1] and 0 < runtime_range[0] < runtime_range[1]):
+            return jsonify({
+                'error': 'budgetRange and runtimeRange must be increasing positive [min, max]',
+                'success': False
+            }), 400
+        
+        result = prediction_service.sensitivity_analysis(
+            data,
+            budget_range=tuple(budget_range),
+            runtime_range=tuple(runtime_range),
+            n_points=max(2, min(n_points, 500)),
+            include_thresholds=bool(data.get('thresholds', False))
+        )
+        
+        return jsonify({
+            'success': True,
+            'title': data.get('title', 'Unknown'),
+            **result
+        })
+        
+    except Exception as e:
+        logger.exception(f"Lỗi khi phân tích độ nhạy: {e}")
+        return jsonify({
+            'error': f'Lỗi khi phân tích độ nhạy: {str(e)}',
+            'success': False
+        }), 500
+
+SAMPLE_DATA = [
+    {
+        'title': 'Blockbuster Action',
+        'budget': 200000000,
+        'runtime': 150,
+        'releaseMonth': 6,
+        'genres': ['Action', 'Adventure', 'Sci-Fi']
+    },
+    {
+        'title': 'Indie Drama',
+        'budget': 5000000,
+        'runtime': 105,
+        'releaseMonth': 10,
+        'genres': ['Drama']
+    },
+    {
+        'title': 'Summer Comedy',
+        'budget': 40000000,
+        'runtime': 98,
+        'releaseMonth': 7,
+        'genres': ['Comedy']
+    },
+    {
+        'title': 'Holiday Horror',
+        'budget': 15000000,
+        'runtime': 95,
+        'releaseMonth': 10,
+        'genres': ['Horror', 'Thriller']
+    }
+]
+
+def build_model_info():
+    return {
         'model_loaded': prediction_service.model is not None,
         'model_type': 'Pre-Release Random Forest',
+        'model_version': prediction_service.model_version,
         'accuracy': prediction_service.model_accuracy,
         'features_count': len(prediction_service.feature_names) if prediction_service.feature_names else 0,
         'features': prediction_service.feature_names[:10] if prediction_service.feature_names else [],
@@ -112,46 +275,46 @@ def model_info():
         'prediction_type': 'pre_release',
         'description': 'Dự đoán trước phát hành - không có data leakage',
         'is_real_model': prediction_service.model is not None
+    }
+
+@app.route('/api/model-info')
+def model_info():
+    """Get information about the loaded Pre-Release model (cached per model version, ETag/304)"""
+    return response_cache.respond_json('model-info', prediction_service.model_version, build_model_info)
+
+@app.route('/api/predict-stats')
+def predict_stats():
+    """/predict counters: single-flight (requests, executed, coalesced...) and audit log (written, dropped...)"""
+    audit_log = prediction_service.prediction_log
+    return jsonify({
+        'single_flight': prediction_service.single_flight.stats(),
+        'audit_log': audit_log.stats() if audit_log is not None else None
     })
 
+@app.route('/api/drift')
+def feature_drift():
+    """PSI/KS of served request features vs. the training baseline (?window=window|lifetime)"""
+    monitor = prediction_service.drift_monitor
+    if monitor is None:
+        return jsonify({'error': 'Drift monitor not available', 'success': False}), 503
+    window = request.args.get('window', 'window')
+    if window not in ('window', 'lifetime'):
+        return jsonify({'error': "window must be 'window' or 'lifetime'", 'success': False}), 400
+    try:
+        min_samples = int(request.args.get('minSamples', 30))
+    except ValueError:
+        return jsonify({'error': 'minSamples must be an integer', 'success': False}), 400
+    return jsonify({'success': True, **monitor.report(window=window, min_samples=min_samples)})
+
 @app.route('/api/sample-data')
 def sample_data():
-    """Get sample data for Pre-Release testing"""
-    samples = [
-        {
-            'title': 'Blockbuster Action',
-            'budget': 200000000,
-            'runtime': 150,
-            'releaseMonth': 6,
-            'genres': ['Action', 'Adventure', 'Sci-Fi']
-        },
-        {
-            'title': 'Indie Drama',
-            'budget': 5000000,
-            'runtime': 105,
-            'releaseMonth': 10,
-            'genres': ['Drama']
-        },
-        {
-            'title': 'Summer Comedy',
-            'budget': 40000000,
-            'runtime': 98,
-            'releaseMonth': 7,
-            'genres': ['Comedy']
-        },
-        {
-            'title': 'Holiday Horror',
-            'budget': 15000000,
-            'runtime': 95,
-            'releaseMonth': 10,
-            'genres': ['Horror', 'Thriller']
-        }
-    ]
-    return jsonify(samples)
+    """Get sample data for Pre-Release testing (static, ETag/304)"""
+    return response_cache.respond_json('sample-data', None, lambda: SAMPLE_DATA,
+                                       cache_control='public, max-age=3600')
 
 @app.errorhandler(404)
 def not_found(error):
-    return render_template('index.html'), 404
+    return render_index(status=404)
 
 @app.errorhandler(500)
 def internal_error(error):
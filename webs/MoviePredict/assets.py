@@ -0,0 +1,162 @@
+"""
+Static Assets & Response Cache
+==============================
+Phục vụ bundle đã build bởi tools/build_assets.py (static/dist/):
+
+- asset_url('css/styles.css') -> /assets/css/styles.<hash>.css nếu có manifest,
+  ngược lại fallback về /static/css/styles.css (chưa chạy build).
+- /assets/<path>: tên file chứa hash nội dung nên gửi với
+  Cache-Control immutable 1 năm; chọn sẵn bản .br/.gz theo Accept-Encoding.
+- ResponseCache: render index.html / JSON API một lần mỗi version (model),
+  giữ bytes + bản nén + ETag; request lặp lại với If-None-Match nhận 304.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import threading
+
+from flask import abort, current_app, request, send_file, url_for
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.path.join(APP_DIR, 'static', 'dist')
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+# HTML/API: luôn revalidate bằng ETag (304 gần như không tốn băng thông)
+REVALIDATE = 'no-cache'
+# Chỉ giữ bản nén nếu nhỏ hơn 90% bản gốc (JSON nhỏ không đáng nén)
+MIN_COMPRESSION_GAIN = 0.9
+
+# Thứ tự ưu tiên encoding -> hậu tố file nén sẵn
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def load_manifest(path=MANIFEST_PATH) -> dict:
+    """{'css/styles.css': {'path': 'css/styles.<hash>.css', 'encodings': {...}}, ...} hoặc {}."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)['assets']
+    except FileNotFoundError:
+        logger.info("Chưa có static/dist/manifest.json, dùng /static/ (chạy tools/build_assets.py)")
+        return {}
+
+
+def _negotiate(available: dict):
+    """Chọn encoding client chấp nhận (q > 0) trong các bản nén sẵn có."""
+    for encoding, suffix in ENCODINGS:
+        if encoding in available and request.accept_encodings[encoding] > 0:
+            return encoding, suffix
+    return None, ''
+
+
+class StaticAssets:
+    """Đăng ký template global asset_url và route /assets/<path> trên Flask app."""
+
+    def __init__(self, app=None, dist_dir=DIST_DIR):
+        self.dist_dir = dist_dir
+        self.manifest = load_manifest(os.path.join(dist_dir, 'manifest.json'))
+        # path đã fingerprint -> entry manifest (chỉ phục vụ file có trong manifest)
+        self.built = {entry['path']: entry for entry in self.manifest.values()}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.add_template_global(self.asset_url, 'asset_url')
+        app.add_url_rule('/assets/<path:filename>', 'assets', self.send_asset)
+
+    def asset_url(self, filename: str) -> str:
+        entry = self.manifest.get(filename)
+        if entry is None:
+            return url_for('static', filename=filename)
+        return url_for('assets', filename=entry['path'])
+
+    def send_asset(self, filename: str):
+        entry = self.built.get(filename)
+        if entry is None:
+            abort(404)
+        encoding, suffix = _negotiate(entry.get('encodings', {}))
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_file(os.path.join(self.dist_dir, filename + suffix), mimetype=mimetype,
+                             conditional=True, etag=True, max_age=31536000)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if entry.get('encodings'):
+            response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE
+        return response
+
+
+class ResponseCache:
+    """
+    Response bytes render sẵn theo (tên, version): body gốc, bản gzip/br và
+    strong ETag. Version đổi (vd. model mới được load) thì render lại; mỗi tên
+    chỉ giữ bản mới nhất.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, version, render, mimetype: str) -> dict:
+        entry = self._entries.get(name)
+        if entry is None or entry['version'] != version:
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is None or entry['version'] != version:
+                    entry = self._build(render(), version, mimetype)
+                    self._entries[name] = entry
+        return entry
+
+    @staticmethod
+    def _build(content, version, mimetype: str) -> dict:
+        body = content if isinstance(content, bytes) else content.encode('utf-8')
+        variants = {None: body}
+        packed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(packed) < len(body) * MIN_COMPRESSION_GAIN:
+            variants['gzip'] = packed
+        if brotli is not None:
+            packed = brotli.compress(body, quality=11)
+            if len(packed) < len(body) * MIN_COMPRESSION_GAIN:
+                variants['br'] = packed
+        return {
+            'version': version,
+            'etag': hashlib.sha256(body).hexdigest()[:16],
+            'mimetype': mimetype,
+            'variants': variants,
+        }
+
+    def respond(self, name: str, version, render, mimetype: str = 'text/html',
+                cache_control: str = REVALIDATE, status: int = 200):
+        """Response từ cache: 304 nếu If-None-Match khớp, ngược lại body đã nén sẵn."""
+        entry = self.get(name, version, render, mimetype)
+        encoding, _ = _negotiate(entry['variants'])
+        # ETag riêng cho từng encoding (bytes khác nhau)
+        etag = f"{entry['etag']}-{encoding}" if encoding else entry['etag']
+
+        response = current_app.response_class(entry['variants'][encoding], status=status,
+                                              mimetype=entry['mimetype'])
+        response.headers['Cache-Control'] = cache_control
+        if len(entry['variants']) > 1:
+            response.vary.add('Accept-Encoding')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        if status == 200:
+            response.make_conditional(request)
+        return response
+
+    def respond_json(self, name: str, version, build_payload, cache_control: str = REVALIDATE):
+        """Như respond() cho JSON: build_payload chỉ được gọi khi version đổi."""
+        return self.respond(name, version, lambda: current_app.json.dumps(build_payload()) + '\n',
+                            mimetype='application/json', cache_control=cache_control)
@@ -9,9 +9,24 @@ import pickle
 import pandas as pd
 import numpy as np
 import os
+import sys
 import logging
+import time
 from datetime import datetime
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+from pipeline.registry import ModelRegistry, file_sha256
+from models.single_flight import SingleFlight
+from pipeline.drift import DriftMonitor, baseline_from_csv
+
+# Role của model trong data/registry
+MODEL_ROLE = 'pre_release'
+
+# release_weekday theo quy ước pandas: 0 = Thứ 2 ... 6 = Chủ nhật
+WEEKDAY_NAMES = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,6 +42,15 @@ class PreReleaseMoviePredictionService:
         self.model = None
         self.scaler = None
         self.feature_names = []
+        self.metrics = {}
+        self._threshold_cache = {}  # feature -> ngưỡng split (đơn vị gốc)
+        self._path_contributions = None  # đóng góp cộng dồn theo node, dựng lúc load model
+        self._node_offsets = None
+        self._base_value = 0.0
+        self.model_version = None  # digest artifact đang serve (key cho cache response)
+        self.single_flight = SingleFlight()  # gộp các predict đồng thời cùng feature vector
+        self.prediction_log = None  # PredictionLogWriter (app gán), ghi audit mọi prediction
+        self.drift_monitor = None  # so sánh phân phối features của request với baseline lúc train
         self.model_accuracy = 0.6765  # Accuracy từ training
         self.model_info = {
             'model_type': 'Pre-Release Random Forest',
@@ -40,14 +64,13 @@ class PreReleaseMoviePredictionService:
         self._load_model()
     
     def _load_model(self) -> None:
-        """Load Pre-Release model từ file pkl."""
+        """Load Pre-Release model đang active trong model registry."""
         try:
-            # Đường dẫn tới project root
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
-            
-            # Load Pre-Release model
-            model_path = os.path.join(project_root, 'data', 'pkl', 'pre_release_rf_model.pkl')
+            # Resolve qua con trỏ active của registry, fallback file pkl cũ
+            model_path = ModelRegistry().resolve(MODEL_ROLE)
+            from_registry = model_path is not None
+            if model_path is None:
+                model_path = os.path.join(PROJECT_ROOT, 'data', 'pkl', 'pre_release_rf_model.pkl')
             
             if os.path.exists(model_path):
                 with open(model_path, 'rb') as f:
@@ -56,13 +79,23 @@ class PreReleaseMoviePredictionService:
                 self.model = model_data['model']
                 self.scaler = model_data['scaler']
                 self.feature_names = model_data['feature_names']
+                self.metrics = model_data.get('metrics', {})
                 
                 # Cập nhật metrics từ model
                 if 'metrics' in model_data:
                     self.model_accuracy = model_data['metrics'].get('accuracy', 0.6765)
                     self.model_info['accuracy'] = self.model_accuracy
                     self.model_info['f1_score'] = model_data['metrics'].get('f1_score', 0.6796)
-                    self.model_info['cv_mean'] = model_data['metrics'].get('cv_mean', 0.6931)
+                    # Model train ở chế độ OOB không có cv_mean -> dùng OOB accuracy
+                    self.model_info['cv_mean'] = model_data['metrics'].get(
+                        'cv_mean', model_data['metrics'].get('oob_accuracy', 0.6931))
+                
+                # Blob registry đặt tên theo digest; file pkl cũ thì hash nội dung
+                self.model_version = (os.path.splitext(os.path.basename(model_path))[0]
+                                      if from_registry else file_sha256(model_path))
+                self._threshold_cache = {}
+                self._build_path_contributions()
+                self._build_drift_monitor(model_data.get('drift_baseline'))
                 
                 logger.info(f"Pre-Release Model loaded: acc={self.model_accuracy*100:.2f}%, features={len(self.feature_names)}")
             else:
@@ -72,11 +105,32 @@ class PreReleaseMoviePredictionService:
             logger.error(f"Lỗi khi load Pre-Release model: {e}")
             raise e
     
+    def _build_drift_monitor(self, baseline: dict = None) -> None:
+        """Baseline lưu trong artifact (retrain.py); model cũ thì tính lại từ clean_movies_features.csv."""
+        if baseline is None:
+            data_path = os.path.join(PROJECT_ROOT, 'data', 'clean_movies_features.csv')
+            if not os.path.exists(data_path):
+                logger.warning("Không có drift baseline cho model, tắt drift monitor")
+                self.drift_monitor = None
+                return
+            baseline = baseline_from_csv(data_path, self.feature_names)
+        self.drift_monitor = DriftMonitor(baseline, self.feature_names)
+    
     def prepare_features(self, input_data: dict) -> np.ndarray:
         """
         Chuẩn bị features từ input data.
         Chỉ sử dụng PRE-RELEASE features (không có revenue, vote_average).
         """
+        feature_vector = self._raw_features(input_data)
+        
+        # Scale features
+        if self.scaler is not None:
+            feature_vector = self.scaler.transform(feature_vector)
+        
+        return feature_vector
+    
+    def _raw_features(self, input_data: dict) -> np.ndarray:
+        """Feature vector (1, n_features) chưa scale, theo thứ tự self.feature_names."""
         try:
             # Khởi tạo tất cả features = 0
             features = {name: 0.0 for name in self.feature_names}
@@ -186,72 +240,363 @@ class PreReleaseMoviePredictionService:
                 features['cast_genre_interaction'] = num_cast * len(genres)
             
             # Tạo feature vector theo đúng thứ tự
-            feature_vector = np.array([features[name] for name in self.feature_names]).reshape(1, -1)
-            
-            # Scale features
-            if self.scaler is not None:
-                feature_vector = self.scaler.transform(feature_vector)
-            
-            return feature_vector
+            return np.array([features[name] for name in self.feature_names], dtype=float).reshape(1, -1)
             
         except Exception as e:
             logger.error(f"Lỗi khi chuẩn bị features: {e}")
             raise e
     
-    def predict(self, input_data: dict) -> dict:
+    def predict(self, input_data: dict, explain: bool = False) -> dict:
         """
         Dự đoán thành công của phim.
         
+        Args:
+            explain: Thêm 'explanation' - đóng góp của từng feature cho phim này
+        
         Returns:
             dict chứa kết quả dự đoán
         """
         try:
-            # Prepare features
-            features = self.prepare_features(input_data)
-            
-            # Predict
-            prediction = self.model.predict(features)[0]
-            probability = self.model.predict_proba(features)[0]
-            
-            success_prob = probability[1]  # Xác suất thành công
-            
-            # Determine risk level
-            if success_prob >= 0.7:
-                risk_level = 'LOW'
-                risk_description = 'Phim có tiềm năng thành công cao'
-            elif success_prob >= 0.5:
-                risk_level = 'MEDIUM'
-                risk_description = 'Phim có tiềm năng trung bình'
-            else:
-                risk_level = 'HIGH'
-                risk_description = 'Phim có rủi ro thất bại cao'
-            
-            # Calculate estimated metrics
+            start = time.perf_counter()
+            # Request đồng thời có cùng feature vector (+ budget cho ROI) chờ chung một lần tính
+            raw_features = self._raw_features(input_data)
             budget = float(input_data.get('budget', 0))
-            estimated_roi = self._estimate_roi(success_prob, budget)
-            
-            result = {
-                'success': bool(prediction == 1),
-                'success_probability': float(success_prob),
-                'confidence': float(max(probability)),
-                'risk_level': risk_level,
-                'risk_description': risk_description,
-                'metrics': {
-                    'estimated_roi': estimated_roi,
-                    'risk_score': round((1 - success_prob) * 100, 1),
-                    'success_score': round(success_prob * 100, 1)
-                },
-                'feature_importance': self._get_top_features(),
-                'model_info': self.model_info,
-                'prediction_type': 'pre_release'
-            }
+            key = (self.model_version, raw_features.tobytes(), budget, bool(explain))
+            result = self.single_flight.do(
+                key, lambda: self._predict_features(raw_features, budget, input_data, explain))
             
+            if self.drift_monitor is not None:
+                self.drift_monitor.observe(raw_features)
+            if self.prediction_log is not None:
+                # Chỉ append vào hàng đợi, không chạm đĩa trên request thread
+                self.prediction_log.record(raw_features, result['success_probability'], result['success'],
+                                           (time.perf_counter() - start) * 1000,
+                                           self.model_version, self.feature_names)
             return result
             
         except Exception as e:
             logger.error(f"Lỗi khi dự đoán: {e}")
             raise e
     
+    def _predict_features(self, raw_features: np.ndarray, budget: float, input_data: dict,
+                          explain: bool) -> dict:
+        """Scale + inference cho một feature vector chưa scale (một lần cho mỗi key single-flight)."""
+        features = self.scaler.transform(raw_features) if self.scaler is not None else raw_features
+        
+        # Predict
+        prediction = self.model.predict(features)[0]
+        probability = self.model.predict_proba(features)[0]
+        
+        success_prob = probability[1]  # Xác suất thành công
+        
+        # Determine risk level
+        if success_prob >= 0.7:
+            risk_level = 'LOW'
+            risk_description = 'Phim có tiềm năng thành công cao'
+        elif success_prob >= 0.5:
+            risk_level = 'MEDIUM'
+            risk_description = 'Phim có tiềm năng trung bình'
+        else:
+            risk_level = 'HIGH'
+            risk_description = 'Phim có rủi ro thất bại cao'
+        
+        # Calculate estimated metrics
+        estimated_roi = self._estimate_roi(success_prob, budget)
+        
+        result = {
+            'success': bool(prediction == 1),
+            'success_probability': float(success_prob),
+            'confidence': float(max(probability)),
+            'risk_level': risk_level,
+            'risk_description': risk_description,
+            'metrics': {
+                'estimated_roi': estimated_roi,
+                'risk_score': round((1 - success_prob) * 100, 1),
+                'success_score': round(success_prob * 100, 1)
+            },
+            'feature_importance': self._get_top_features(),
+            'model_info': self.model_info,
+            'prediction_type': 'pre_release'
+        }
+        
+        if explain:
+            # Giải thích theo đường đi chỉ có với forest (estimators_ là cây quyết định)
+            result['explanation'] = (self.explain(features, input_data)
+                                     if self._path_contributions is not None else None)
+        
+        return result
+    
+    def _build_path_contributions(self) -> None:
+        """
+        Tiền tính thống kê node của mọi cây (gọi một lần khi load model).
+        
+        Đi từ root xuống, mỗi lần split trên feature f thì feature f nhận
+        (P(success | node con) - P(success | node cha)) / n_trees. Cộng dồn dọc
+        đường đi cho ra vector đóng góp của từng node; vì đường đi được xác định
+        bởi leaf, đóng góp của một dòng = tổng vector của leaf nó rơi vào ở mỗi cây.
+        """
+        estimators = getattr(self.model, 'estimators_', None)
+        if not estimators:
+            self._path_contributions = None
+            return
+        
+        class_index = list(self.model.classes_).index(1)
+        n_trees = len(estimators)
+        tables, offsets = [], []
+        base_value = 0.0
+        offset = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            counts = tree.value[:, 0, :]
+            node_prob = counts[:, class_index] / counts.sum(axis=1)
+            base_value += node_prob[0]
+            
+            # Node cha luôn có id nhỏ hơn node con -> duyệt theo id là đủ thứ tự top-down
+            cumulative = np.zeros((tree.node_count, len(self.feature_names)))
+            for node in np.flatnonzero(tree.children_left >= 0):
+                for child in (tree.children_left[node], tree.children_right[node]):
+                    cumulative[child] = cumulative[node]
+                    cumulative[child, tree.feature[node]] += node_prob[child] - node_prob[node]
+            tables.append(cumulative / n_trees)
+            offsets.append(offset)
+            offset += tree.node_count
+        
+        self._path_contributions = np.vstack(tables)
+        self._node_offsets = np.array(offsets)
+        self._base_value = base_value / n_trees
+    
+    def feature_contributions(self, features: np.ndarray) -> np.ndarray:
+        """
+        Đóng góp cộng tính của từng feature, shape (n_rows, n_features).
+        base_value + tổng đóng góp của một dòng = predict_proba[:, 1] của dòng đó.
+        """
+        if self._path_contributions is None:
+            raise ValueError("Model hiện tại không hỗ trợ giải thích theo đường đi của cây")
+        # Gọi apply từng cây trực tiếp: với vài dòng, overhead thread pool của forest.apply lớn hơn nhiều
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        leaves = np.column_stack([estimator.apply(features, check_input=False)
+                                  for estimator in self.model.estimators_])
+        return self._path_contributions[leaves + self._node_offsets].sum(axis=1)
+    
+    def explain(self, features: np.ndarray, input_data: dict = None, top_n: int = 10) -> dict:
+        """Top features đẩy xác suất thành công lên/xuống cho một phim (features đã scale)."""
+        contributions = self.feature_contributions(features)[0]
+        raw_values = self._raw_features(input_data)[0] if input_data is not None else None
+        order = np.argsort(-np.abs(contributions), kind='stable')
+        
+        items = []
+        for i in order[:top_n]:
+            if contributions[i] == 0:
+                break
+            item = {
+                'feature': self.feature_names[i],
+                'contribution': round(float(contributions[i]) * 100, 2),
+                'direction': 'positive' if contributions[i] > 0 else 'negative'
+            }
+            if raw_values is not None:
+                item['value'] = float(raw_values[i])
+            items.append(item)
+        
+        return {
+            'method': 'tree_path',
+            'base_value': round(self._base_value * 100, 2),
+            'contributions': items,
+            'other_contribution': round(float(contributions[order[len(items):]].sum()) * 100, 2)
+        }
+    
+    def optimize_release_window(self, input_data: dict, top_n: int = 10) -> dict:
+        """
+        Chấm điểm toàn bộ lưới tháng × thứ (12 × 7) cho một phim.
+        
+        Encode input một lần, nhân thành 84 dòng rồi chỉ ghi đè các cột thời gian
+        (release_month, release_weekday, release_quarter, is_holiday_season),
+        scale và gọi predict_proba MỘT lần cho cả lưới.
+        
+        Returns:
+            dict với heatmap [12][7] xác suất thành công, ranking top_n và best window
+        """
+        months = np.repeat(np.arange(1, 13), 7)
+        weekdays = np.tile(np.arange(7), 12)
+        
+        grid = np.repeat(self._raw_features(input_data), len(months), axis=0)
+        time_columns = {
+            'release_month': months,
+            'release_weekday': weekdays,
+            'release_quarter': (months - 1) // 3 + 1,
+            'is_holiday_season': np.isin(months, [6, 7, 11, 12]).astype(float),
+        }
+        for name, values in time_columns.items():
+            if name in self.feature_names:
+                grid[:, self.feature_names.index(name)] = values
+        
+        if self.scaler is not None:
+            grid = self.scaler.transform(grid)
+        success_probs = self.model.predict_proba(grid)[:, 1]
+        
+        budget = float(input_data.get('budget', 0))
+        order = np.argsort(-success_probs, kind='stable')
+        ranking = [
+            {
+                'rank': rank + 1,
+                'month': int(months[i]),
+                'weekday': int(weekdays[i]),
+                'weekday_name': WEEKDAY_NAMES[weekdays[i]],
+                'success_probability': round(float(success_probs[i]), 4),
+                'estimated_roi': self._estimate_roi(float(success_probs[i]), budget)
+            }
+            for rank, i in enumerate(order[:top_n])
+        ]
+        
+        # Xác suất ở thời điểm phát hành hiện tại của input (để so sánh)
+        current_month = int(input_data.get('releaseMonth', datetime.now().month))
+        current_weekday = int(input_data.get('releaseWeekday', 4))
+        current_prob = float(success_probs[(current_month - 1) * 7 + current_weekday])
+        
+        return {
+            'heatmap': np.round(success_probs.reshape(12, 7), 4).tolist(),
+            'months': list(range(1, 13)),
+            'weekdays': WEEKDAY_NAMES,
+            'ranking': ranking,
+            'best': ranking[0],
+            'current': {
+                'month': current_month,
+                'weekday': current_weekday,
+                'success_probability': round(current_prob, 4)
+            },
+            'uplift': round(float(success_probs[order[0]]) - current_prob, 4),
+            'prediction_type': 'pre_release'
+        }
+    
+    def sensitivity_analysis(self, input_data: dict, budget_range: tuple = (1e6, 3e8),
+                             runtime_range: tuple = (60, 200), n_points: int = 50,
+                             include_thresholds: bool = False) -> dict:
+        """
+        Đường cong xác suất thành công + ROI ước tính theo budget (log-spaced) và runtime.
+        
+        Cả 2 sweep (và các điểm giữa ngưỡng nếu include_thresholds) được ghép
+        thành MỘT ma trận features, scale và predict_proba một lần.
+        
+        Vì forest là hàm hằng từng khúc, include_thresholds trả thêm các giá trị
+        budget/runtime chính xác mà xác suất thay đổi (ngưỡng split của các cây
+        trên Budget_log và runtime_minutes/runtime_hours).
+        """
+        base = self._raw_features(input_data)
+        budget = float(input_data.get('budget', 0))
+        runtime = float(input_data.get('runtime', 120))
+        
+        budgets = np.logspace(np.log10(budget_range[0]), np.log10(budget_range[1]), n_points)
+        runtimes = np.linspace(runtime_range[0], runtime_range[1], n_points)
+        
+        blocks = [self._with_budget(base, budgets), self._with_runtime(base, runtimes)]
+        if include_thresholds:
+            budget_cuts = self._thresholds_in_range('budget', budget_range)
+            runtime_cuts = self._thresholds_in_range('runtime', runtime_range)
+            budget_mids = self._segment_midpoints(budget_cuts, budget_range)
+            runtime_mids = self._segment_midpoints(runtime_cuts, runtime_range)
+            blocks += [self._with_budget(base, budget_mids), self._with_runtime(base, runtime_mids)]
+        
+        grid = np.vstack(blocks)
+        if self.scaler is not None:
+            grid = self.scaler.transform(grid)
+        success_probs = self.model.predict_proba(grid)[:, 1]
+        
+        budget_probs = success_probs[:n_points]
+        runtime_probs = success_probs[n_points:2 * n_points]
+        result = {
+            'budget_curve': [
+                {
+                    'budget': round(float(b), 2),
+                    'success_probability': round(float(p), 4),
+                    'estimated_roi': self._estimate_roi(float(p), float(b))
+                }
+                for b, p in zip(budgets, budget_probs)
+            ],
+            'runtime_curve': [
+                {
+                    'runtime': round(float(r), 2),
+                    'success_probability': round(float(p), 4),
+                    'estimated_roi': self._estimate_roi(float(p), budget)
+                }
+                for r, p in zip(runtimes, runtime_probs)
+            ],
+            'base': {'budget': budget, 'runtime': runtime},
+            'prediction_type': 'pre_release'
+        }
+        
+        if include_thresholds:
+            offset = 2 * n_points
+            budget_seg_probs = success_probs[offset:offset + len(budget_mids)]
+            runtime_seg_probs = success_probs[offset + len(budget_mids):]
+            result['thresholds'] = {
+                'budget': self._change_points(budget_cuts, budget_seg_probs),
+                'runtime': self._change_points(runtime_cuts, runtime_seg_probs)
+            }
+        return result
+    
+    def _with_budget(self, base: np.ndarray, budgets: np.ndarray) -> np.ndarray:
+        rows = np.repeat(base, len(budgets), axis=0)
+        if 'Budget_log' in self.feature_names:
+            rows[:, self.feature_names.index('Budget_log')] = np.where(budgets > 0, np.log10(budgets + 1), 0)
+        return rows
+    
+    def _with_runtime(self, base: np.ndarray, runtimes: np.ndarray) -> np.ndarray:
+        rows = np.repeat(base, len(runtimes), axis=0)
+        if 'runtime_minutes' in self.feature_names:
+            rows[:, self.feature_names.index('runtime_minutes')] = runtimes
+        if 'runtime_hours' in self.feature_names:
+            rows[:, self.feature_names.index('runtime_hours')] = runtimes / 60.0
+        return rows
+    
+    def _split_thresholds(self, feature: str) -> np.ndarray:
+        """Các ngưỡng split (đơn vị gốc, chưa scale) của feature trên toàn forest."""
+        cache = self._threshold_cache
+        if feature not in cache:
+            if feature not in self.feature_names or not hasattr(self.model, 'estimators_'):
+                cache[feature] = np.array([])
+            else:
+                index = self.feature_names.index(feature)
+                scaled = np.unique(np.concatenate([
+                    tree.tree_.threshold[tree.tree_.feature == index]
+                    for tree in self.model.estimators_
+                ]))
+                if self.scaler is not None and len(scaled):
+                    # Đưa ngưỡng về đơn vị gốc qua inverse_transform của scaler
+                    matrix = np.zeros((len(scaled), len(self.feature_names)))
+                    matrix[:, index] = scaled
+                    scaled = self.scaler.inverse_transform(matrix)[:, index]
+                cache[feature] = scaled
+        return cache[feature]
+    
+    def _thresholds_in_range(self, kind: str, value_range: tuple) -> np.ndarray:
+        """Ngưỡng quy về budget ($) hoặc runtime (phút), nằm trong value_range."""
+        if kind == 'budget':
+            cuts = 10 ** self._split_thresholds('Budget_log') - 1
+        else:
+            cuts = np.concatenate([self._split_thresholds('runtime_minutes'),
+                                   self._split_thresholds('runtime_hours') * 60.0])
+        cuts = np.unique(cuts)
+        return cuts[(cuts > value_range[0]) & (cuts < value_range[1])]
+    
+    @staticmethod
+    def _segment_midpoints(cuts: np.ndarray, value_range: tuple) -> np.ndarray:
+        """Một điểm đại diện cho mỗi khoảng hằng giữa các ngưỡng liên tiếp."""
+        edges = np.concatenate([[value_range[0]], cuts, [value_range[1]]])
+        return (edges[:-1] + edges[1:]) / 2
+    
+    @staticmethod
+    def _change_points(cuts: np.ndarray, segment_probs: np.ndarray) -> list:
+        """Giữ các ngưỡng mà xác suất 2 khoảng kề nhau thực sự khác nhau."""
+        changed = segment_probs[1:] != segment_probs[:-1]
+        return [
+            {
+                'value': round(float(cut), 2),
+                'probability_before': round(float(before), 4),
+                'probability_after': round(float(after), 4)
+            }
+            for cut, before, after in zip(cuts[changed], segment_probs[:-1][changed],
+                                          segment_probs[1:][changed])
+        ]
+    
     def _estimate_roi(self, success_prob: float, budget: float) -> float:
         """Ước tính ROI dựa trên xác suất thành công."""
         if budget <= 0:
@@ -274,7 +619,11 @@ class PreReleaseMoviePredictionService:
         if self.model is None:
             return []
         
-        importances = self.model.feature_importances_
+        importances = getattr(self.model, 'feature_importances_', None)
+        if importances is None:
+            # Model không có importance sẵn (vd. HistGradientBoosting) -> permutation importance lúc train
+            importances = [self.metrics.get('feature_importances', {}).get(name, 0.0)
+                           for name in self.feature_names]
         feature_importance = list(zip(self.feature_names, importances))
         feature_importance.sort(key=lambda x: x[1], reverse=True)
         
@@ -8,9 +8,19 @@ import pandas as pd
 import numpy as np
 import os
 import sys
+import threading
 from datetime import datetime
 import logging
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+from pipeline.registry import ModelRegistry
+from pipeline.split_store import load_manifest, load_scaler
+
+# Role của model trong data/registry
+MODEL_ROLE = 'optimized_rf'
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -37,19 +47,20 @@ class MoviePredictionService:
             current_dir = os.path.dirname(os.path.abspath(__file__))
             project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
             
-            # Load scaler và feature names
-            train_test_data_path = os.path.join(project_root, 'data', 'pkl', 'train_test_data.pkl')
-            if os.path.exists(train_test_data_path):
-                with open(train_test_data_path, 'rb') as f:
-                    train_data = pickle.load(f)
-                    self.scaler = train_data.get('scaler')
-                    self.feature_columns = train_data.get('feature_names', [])
+            # Load scaler và feature names từ manifest của data/split (không load dữ liệu train)
+            split_dir = os.path.join(project_root, 'data', 'split')
+            if os.path.exists(os.path.join(split_dir, 'manifest.json')):
+                manifest = load_manifest(split_dir)
+                self.scaler = load_scaler(manifest=manifest)
+                self.feature_columns = manifest.get('feature_names', [])
                 logger.debug("Scaler loaded: %s features", len(self.feature_columns))
             else:
-                raise FileNotFoundError(f"train_test_data.pkl không tìm thấy tại {train_test_data_path}")
+                raise FileNotFoundError(f"data/split/manifest.json không tìm thấy tại {split_dir}")
             
-            # Load Random Forest model
-            model_path = os.path.join(project_root, 'data', 'pkl', 'optimized_rf_model.pkl')
+            # Load Random Forest model (registry trước, fallback file pkl tuần 6)
+            model_path = ModelRegistry().resolve(MODEL_ROLE)
+            if model_path is None:
+                model_path = os.path.join(project_root, 'data', 'pkl', 'optimized_rf_model.pkl')
             if os.path.exists(model_path):
                 with open(model_path, 'rb') as f:
                     model_data = pickle.load(f)
@@ -616,9 +627,29 @@ class MoviePredictionService:
             return 'Mùa thấp điểm - Ít cạnh tranh'
 
 
-# Singleton instance
-prediction_service = MoviePredictionService()
+# Singleton instance: chỉ khởi tạo (load model + scaler) ở lần dùng đầu tiên,
+# import module không tốn thời gian/bộ nhớ cho tools không cần dự đoán.
+_prediction_service = None
+_prediction_service_lock = threading.Lock()
 
 def get_prediction_service():
-    """Get the singleton prediction service instance"""
-    return prediction_service
\ No newline at end of file
+    """Get the singleton prediction service instance (lazy, thread-safe)"""
+    global _prediction_service
+    if _prediction_service is None:
+        with _prediction_service_lock:
+            # Kiểm tra lại sau khi giữ lock: thread khác có thể đã khởi tạo xong
+            if _prediction_service is None:
+                _prediction_service = MoviePredictionService()
+    return _prediction_service
+
+def preload():
+    """Khởi tạo service ngay (vd. trong hook post_fork của gunicorn) để worker nhận request đầu đã warm"""
+    service = get_prediction_service()
+    logger.info("Prediction service preloaded")
+    return service
+
+def __getattr__(name):
+    # Tương thích ngược: `from models.prediction_service import prediction_service`
+    if name == 'prediction_service':
+        return get_prediction_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""
+Single-flight
+=============
+Gộp các lời gọi đồng thời cùng key thành một lần tính: request đầu tiên
+(leader) chạy hàm, các request đến trong lúc đó chờ và nhận chung kết quả
+(hoặc chung exception). Key chỉ sống trong lúc đang tính - đây không phải
+cache, request sau khi leader xong sẽ tính lại.
+"""
+
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._requests = 0
+        self._executed = 0
+        self._coalesced = 0
+        self._errors = 0
+        self._max_waiters = 0
+
+    def do(self, key, fn):
+        """
+        Chạy fn() một lần cho mỗi key đang in-flight.
+        Kết quả được chia sẻ giữa các caller - coi như read-only.
+        """
+        with self._lock:
+            self._requests += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._coalesced += 1
+                self._max_waiters = max(self._max_waiters, call.waiters)
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'executed': self._executed,
+                'coalesced': self._coalesced,
+                'coalesced_ratio': round(self._coalesced / self._requests, 4) if self._requests else 0.0,
+                'errors': self._errors,
+                'in_flight': len(self._calls),
+                'max_waiters': self._max_waiters,
+            }
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Static asset build: minify, fingerprint and precompress everything under static/.
+
+Usage:
+    python tools/build_assets.py           # writes static/dist/ + static/dist/manifest.json
+    python tools/build_assets.py --check   # also runs `node --check` on the minified JS
+
+Output layout:
+    static/dist/js/app.<hash>.js      (+ .gz, + .br when the `brotli` package is installed)
+    static/dist/css/styles.<hash>.css (+ .gz, .br)
+    static/dist/images/member1.<hash>.jpg
+    static/dist/manifest.json
+
+Manifest schema (sizes in bytes, keyed by the source path under static/):
+    {"assets": {"css/styles.css": {"path": "css/styles.<hash>.css",
+                                   "size": <built>, "source_size": <source>,
+                                   "encodings": {"br": <size>, "gzip": <size>}},
+                ...}}
+"encodings" only lists the precompressed variants actually kept next to the file.
+
+The hash is taken from the built bytes, so a file's URL only changes when its
+content does and the app can serve /assets/* as immutable. app.py falls back to
+the plain /static/ files when no manifest exists.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = Path(__file__).resolve().parent.parent
+STATIC_DIR = ROOT / 'static'
+DIST_DIR = STATIC_DIR / 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# Source files that get a fingerprinted copy (paths relative to static/)
+SOURCES = ['css/styles.css', 'js/app.js', 'favicon/logo.svg',
+           'images/member1.jpg', 'images/member2.jpg', 'images/member3.jpg']
+
+COMPRESSIBLE = {'.js', '.css', '.svg', '.json', '.html', '.txt'}
+MIN_COMPRESSION_GAIN = 0.9   # keep a .gz/.br sibling only if it is < 90% of the original
+HASH_LENGTH = 10
+
+# ============ CSS Minifier ============
+
+CSS_TOKEN_RE = re.compile(r'''
+    (?P<comment>/\*.*?\*/)
+  | (?P<string>"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')
+  | (?P<url>url\(\s*[^'")][^)]*\))
+  | (?P<space>\s+)
+  | (?P<other>.)
+''', re.S | re.X)
+
+# No whitespace is needed on either side of these
+CSS_PUNCT = set('{};,>')
+
+def minify_css(source):
+    """
+    Conservative CSS minifier: drops comments, collapses whitespace, removes it
+    around { } ; , > and after ':' and the last ';' of a block. Strings and
+    unquoted url() are copied verbatim; spaces inside calc() are preserved.
+    """
+    out = []
+    pending_space = False
+    for match in CSS_TOKEN_RE.finditer(source):
+        kind = match.lastgroup
+        text = match.group()
+        if kind == 'comment':
+            continue
+        if kind == 'space':
+            pending_space = True
+            continue
+        if pending_space and out:
+            prev = out[-1][-1]
+            if prev not in CSS_PUNCT and prev != ':' and text not in CSS_PUNCT:
+                out.append(' ')
+        pending_space = False
+        if text == '}' and out and out[-1] == ';':
+            out.pop()
+        out.append(text)
+    return ''.join(out).strip() + '\n'
+
+# ============ JS Minifier ============
+
+JS_PUNCTUATORS = sorted([
+    '>>>=', '...', '===', '!==', '**=', '<<=', '>>=', '>>>', '&&=', '||=', '??=',
+    '=>', '==', '!=', '<=', '>=', '&&', '||', '??', '?.', '++', '--', '+=', '-=', '*=',
+    '/=', '%=', '&=', '|=', '^=', '<<', '>>', '**',
+], key=len, reverse=True)
+JS_PUNCT_RE = re.compile('|'.join(re.escape(p) for p in JS_PUNCTUATORS) + r'|[{}()\[\];,<>+\-*/%&|^!~?:=.@#]')
+JS_IDENT_RE = re.compile(r'[\w$\u0080-￿]+')
+JS_NUMBER_RE = re.compile(r'\.?\d[\w.]*(?:[eE][+-]\d+)?')
+
+# A '/' after these tokens starts a regex literal, not a division
+REGEX_PREFIX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+                         'throw', 'case', 'do', 'else', 'yield', 'await'}
+# Tokens that can end an expression / start a statement (ASI-relevant around newlines)
+ASI_START_PUNCT = {'(', '[', '{', '+', '-', '/', '++', '--', '!', '~', '`', '.', '?.'}
+ASI_END_PUNCT = {')', ']', '}', '++', '--'}
+
+def _scan_string(source, i):
+    quote = source[i]
+    j = i + 1
+    while j < len(source):
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == quote:
+            return j + 1
+        if c == '\n':
+            raise ValueError(f'Unterminated string literal at offset {i}')
+        j += 1
+    raise ValueError(f'Unterminated string literal at offset {i}')
+
+def _scan_template(source, i):
+    """End offset of a template literal starting at source[i] == '`' (handles nested ${...})."""
+    j = i + 1
+    while j < len(source):
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == '`':
+            return j + 1
+        if source.startswith('${', j):
+            j = _scan_braces(source, j + 2)
+            continue
+        j += 1
+    raise ValueError(f'Unterminated template literal at offset {i}')
+
+def _scan_braces(source, j):
+    """Skip a ${...} substitution body; returns the offset after its closing brace."""
+    depth = 1
+    while j < len(source):
+        c = source[j]
+        if c in '\'"':
+            j = _scan_string(source, j)
+            continue
+        if c == '`':
+            j = _scan_template(source, j)
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return j + 1
+        j += 1
+    raise ValueError('Unterminated template substitution')
+
+def _scan_regex(source, i):
+    j = i + 1
+    in_class = False
+    while j < len(source):
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == '\n':
+            raise ValueError(f'Unterminated regex literal at offset {i}')
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            j += 1
+            while j < len(source) and (source[j].isalnum() or source[j] == '_'):
+                j += 1
+            return j
+        j += 1
+    raise ValueError(f'Unterminated regex literal at offset {i}')
+
+def tokenize_js(source):
+    """
+    Split JS into (kind, text, newline_before) tokens, dropping comments and
+    whitespace. kind is one of: ident, number, string, template, regex, punct.
+    """
+    tokens = []
+    i = 0
+    newline = False
+    n = len(source)
+    while i < n:
+        c = source[i]
+        if c in ' \t\r\n\f\v﻿ ':
+            newline = newline or c == '\n'
+            i += 1
+            continue
+        if source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end < 0 else end
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            if end < 0:
+                raise ValueError(f'Unterminated comment at offset {i}')
+            newline = newline or '\n' in source[i:end]
+            i = end + 2
+            continue
+
+        if c in '\'"':
+            end, kind = _scan_string(source, i), 'string'
+        elif c == '`':
+            end, kind = _scan_template(source, i), 'template'
+        elif c == '/' and _regex_allowed(tokens):
+            end, kind = _scan_regex(source, i), 'regex'
+        elif c.isdigit() or (c == '.' and i + 1 < n and source[i + 1].isdigit()):
+            end, kind = JS_NUMBER_RE.match(source, i).end(), 'number'
+        elif JS_IDENT_RE.match(source, i):
+            end, kind = JS_IDENT_RE.match(source, i).end(), 'ident'
+        else:
+            match = JS_PUNCT_RE.match(source, i)
+            if not match:
+                raise ValueError(f'Unexpected character {c!r} at offset {i}')
+            end, kind = match.end(), 'punct'
+        tokens.append((kind, source[i:end], newline))
+        newline = False
+        i = end
+    return tokens
+
+def _regex_allowed(tokens):
+    if not tokens:
+        return True
+    kind, text, _ = tokens[-1]
+    if kind == 'ident':
+        return text in REGEX_PREFIX_KEYWORDS
+    if kind == 'punct':
+        return text not in (')', ']', '}', '++', '--')
+    return False
+
+def _word_like(token):
+    return token[0] in ('ident', 'number')
+
+def _separator(prev, token):
+    """Minimal text needed between two tokens so they neither merge nor change ASI."""
+    if token[2]:
+        ends_expression = prev[0] != 'punct' or prev[1] in ASI_END_PUNCT
+        starts_expression = token[0] != 'punct' or token[1] in ASI_START_PUNCT
+        if ends_expression and starts_expression:
+            return '\n'
+    if _word_like(prev) and _word_like(token):
+        return ' '
+    if prev[0] == 'number' and token[1].startswith('.'):
+        return ' '
+    # a + +b, a - -b, a / /re/, a++ + b
+    if prev[0] == 'punct' and token[0] in ('punct', 'regex'):
+        if prev[1][-1] in '+-/' and token[1][0] == prev[1][-1]:
+            return ' '
+    # `<!--` / `-->` would read as HTML comments
+    if prev[1].endswith('<') and token[1].startswith('!'):
+        return ' '
+    return ''
+
+def minify_js(source):
+    """
+    Whitespace/comment-only JS minifier. Identifiers are never renamed;
+    newlines are kept wherever automatic semicolon insertion could depend on them.
+    """
+    tokens = tokenize_js(source)
+    out = []
+    prev = None
+    for token in tokens:
+        if prev is not None:
+            out.append(_separator(prev, token))
+        out.append(token[1])
+        prev = token
+    return ''.join(out) + '\n'
+
+# ============ Build ============
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+def fingerprinted_name(rel_path, data):
+    path = Path(rel_path)
+    return str(path.with_name(f'{path.stem}.{content_hash(data)}{path.suffix}').as_posix())
+
+def precompress(path, data):
+    """Write .gz (and .br) siblings when they are meaningfully smaller. Returns {encoding: size}."""
+    sizes = {}
+    if path.suffix not in COMPRESSIBLE:
+        return sizes
+    variants = {'gzip': ('.gz', lambda d: gzip.compress(d, compresslevel=9, mtime=0))}
+    if brotli is not None:
+        variants['br'] = ('.br', lambda d: brotli.compress(d, quality=11))
+    for encoding, (suffix, compress) in variants.items():
+        packed = compress(data)
+        if len(packed) < len(data) * MIN_COMPRESSION_GAIN:
+            _write_atomic(path.with_name(path.name + suffix), packed)
+            sizes[encoding] = len(packed)
+    return sizes
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def build(static_dir=STATIC_DIR, dist_dir=DIST_DIR, sources=SOURCES, check=False):
+    """Build every source into dist_dir and write the manifest. Returns the manifest dict."""
+    static_dir, dist_dir = Path(static_dir), Path(dist_dir)
+    assets = {}
+    for rel_path in sources:
+        source_path = static_dir / rel_path
+        data = source_path.read_bytes()
+        minify = MINIFIERS.get(source_path.suffix)
+        if minify:
+            data = minify(data.decode('utf-8')).encode('utf-8')
+        built = fingerprinted_name(rel_path, data)
+        target = dist_dir / built
+        _write_atomic(target, data)
+        if check and source_path.suffix == '.js':
+            _node_check(target)
+        assets[rel_path] = {
+            'path': built,
+            'size': len(data),
+            'source_size': source_path.stat().st_size,
+            'encodings': precompress(target, data),
+        }
+
+    manifest = {'assets': assets}
+    _write_atomic(dist_dir / MANIFEST_NAME,
+                  json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    _remove_stale(dist_dir, assets)
+    return manifest
+
+def _remove_stale(dist_dir, assets):
+    """Delete outputs of previous builds that the new manifest no longer references."""
+    keep = {dist_dir / MANIFEST_NAME}
+    for entry in assets.values():
+        built = dist_dir / entry['path']
+        keep.add(built)
+        keep.update(built.with_name(built.name + suffix) for suffix in ('.gz', '.br'))
+    for path in dist_dir.rglob('*'):
+        if path.is_file() and path not in keep:
+            path.unlink()
+
+def _node_check(path):
+    node = shutil.which('node')
+    if node is None:
+        print(f'  (node not found, skipped syntax check of {path.name})')
+        return
+    result = subprocess.run([node, '--check', str(path)], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f'Minified JS failed `node --check`: {path}\n{result.stderr}')
+
+def main():
+    parser = argparse.ArgumentParser(description="Build fingerprinted, precompressed static assets")
+    parser.add_argument("--out", default=str(DIST_DIR), help="Output directory")
+    parser.add_argument("--check", action="store_true", help="Run `node --check` on minified JS")
+    args = parser.parse_args()
+
+    manifest = build(dist_dir=args.out, check=args.check)
+    if brotli is None:
+        print('brotli not installed: only .gz siblings written (pip install brotli)')
+    for rel_path, entry in manifest['assets'].items():
+        encoded = ', '.join(f'{enc} {size / 1024:.1f} KB' for enc, size in entry['encodings'].items())
+        print(f"{rel_path:<22} {entry['source_size'] / 1024:7.1f} KB -> {entry['size'] / 1024:7.1f} KB"
+              f"  {entry['path']}" + (f'  ({encoded})' if encoded else ''))
+    print(f'Manifest: {Path(args.out) / MANIFEST_NAME}')
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,36 @@
 #!/usr/bin/env python3
 """
-Simple WCAG contrast checker for two hex colors.
-Usage: python tools/contrast_check.py # prints contrast between configured colors
+Simple WCAG contrast checker for two hex colors, plus a batch audit over
+whole palette tables.
+
+Usage:
+    python tools/contrast_check.py            # prints contrast between configured colors
+    python tools/contrast_check.py --audit    # audits colors.csv palettes + static/css themes
+    python tools/contrast_check.py --audit --all-pairs --json
+
+The audit computes the full pairwise contrast matrix of every palette in one
+vectorized NumPy pass (palettes sharing the same roles are stacked into a
+(P, R, R) tensor) and reports the failing pairs per palette.
 """
 
+import argparse
+import csv
+import json
 import math
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_COLORS_CSV = ROOT / '.shared' / 'ui-ux-pro-max' / 'data' / 'colors.csv'
+DEFAULT_THEME_GLOB = 'static/css/*.css'
+
+# WCAG 2.1 thresholds: 1.4.3 (normal text) and 1.4.11 (UI components / large text)
+AA_NORMAL = 4.5
+AA_LARGE = 3.0
 
 def hex_to_rgb(hexstr):
     hexstr = hexstr.strip().lstrip('#')
@@ -35,6 +61,193 @@ def contrast_ratio(hex1, hex2):
     L2 = min(lum1, lum2)
     return (L1 + 0.05) / (L2 + 0.05)
 
+# ============ Vectorized ============
+
+HEX_RE = re.compile(r'#([0-9A-Fa-f]{6}|[0-9A-Fa-f]{3})\b')
+LUMA_WEIGHTS = np.array([0.2126, 0.7152, 0.0722])
+
+def hex_array_to_rgb(hexes):
+    """(n,) hex strings -> (n, 3) uint8 array."""
+    normalized = []
+    for h in hexes:
+        h = h.strip().lstrip('#')
+        if len(h) == 3:
+            h = ''.join([c*2 for c in h])
+        normalized.append(h)
+    if not normalized:
+        return np.zeros((0, 3), dtype=np.uint8)
+    packed = np.frombuffer(bytes.fromhex(''.join(normalized)), dtype=np.uint8)
+    return packed.reshape(-1, 3)
+
+def relative_luminance_array(rgb):
+    """(..., 3) sRGB 0-255 -> (...) relative luminance (same formula as relative_luminance)."""
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(c <= 0.03928, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    return linear @ LUMA_WEIGHTS
+
+def contrast_matrix(luminance):
+    """(..., R) luminances -> (..., R, R) symmetric contrast ratios."""
+    lum = np.asarray(luminance)[..., :, None]
+    other = np.asarray(luminance)[..., None, :]
+    return (np.maximum(lum, other) + 0.05) / (np.minimum(lum, other) + 0.05)
+
+# ============ Palette Loading ============
+
+def role_kind(role):
+    """Classify a palette role by name: background, text, border or accent."""
+    name = role.lower()
+    if 'background' in name or name.startswith('bg') or '-bg' in name:
+        return 'background'
+    if 'text' in name:
+        return 'text'
+    if 'border' in name:
+        return 'border'
+    return 'accent'
+
+def load_colors_csv(path=DEFAULT_COLORS_CSV):
+    """ui-ux-pro-max colors.csv -> [{'name', 'source', 'colors': {role: hex}}]."""
+    palettes = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            colors = {}
+            for column, value in row.items():
+                if column.endswith('(Hex)') and value and HEX_RE.fullmatch(value.strip()):
+                    colors[column[:-len('(Hex)')].strip()] = value.strip()
+            if colors:
+                palettes.append({
+                    'name': f"{row.get('No', '').strip()} {row.get('Product Type', '').strip()}".strip(),
+                    'source': Path(path).name,
+                    'colors': colors,
+                })
+    return palettes
+
+def load_theme_css(path):
+    """Hex-valued custom properties of each rule block in a CSS file, one palette per selector."""
+    text = re.sub(r'/\*.*?\*/', '', Path(path).read_text(encoding='utf-8'), flags=re.S)
+    palettes = []
+    for selector, body in re.findall(r'([^{}]+)\{([^{}]*)\}', text):
+        colors = {}
+        for name, value in re.findall(r'--([\w-]+)\s*:\s*([^;]+)', body):
+            match = HEX_RE.fullmatch(value.strip())
+            if match:
+                colors[name] = value.strip()
+        if colors:
+            # Text before '{' may also hold at-rule statements (@import ...;) - keep the part after the last ';'
+            selector = selector.rsplit(';', 1)[-1]
+            palettes.append({
+                'name': ' '.join(selector.split()),
+                'source': Path(path).name,
+                'colors': colors,
+            })
+    return palettes
+
+# ============ Audit ============
+
+def required_pairs(roles, all_pairs=False, min_ratio=None):
+    """
+    (R, R) threshold matrix; 0 means the pair is not checked.
+    Default rules: text on background >= 4.5, accent on background >= 3.0.
+    all_pairs checks every distinct pair against min_ratio (default 4.5).
+    """
+    n = len(roles)
+    thresholds = np.zeros((n, n))
+    if all_pairs:
+        thresholds[np.triu_indices(n, k=1)] = min_ratio or AA_NORMAL
+        return thresholds
+    kinds = [role_kind(r) for r in roles]
+    for i, kind in enumerate(kinds):
+        for j, other in enumerate(kinds):
+            if other != 'background' or i == j:
+                continue
+            if kind == 'text':
+                thresholds[i, j] = min_ratio or AA_NORMAL
+            elif kind == 'accent':
+                thresholds[i, j] = min_ratio or AA_LARGE
+    return thresholds
+
+def audit_palettes(palettes, all_pairs=False, min_ratio=None):
+    """
+    Contrast audit of many palettes at once. Every distinct hex is converted and
+    its luminance computed once; palettes with the same role list are stacked and
+    their (P, R, R) contrast matrices computed in a single broadcast.
+
+    Returns [{'name', 'source', 'checked', 'failures': [{'foreground', 'background', ...}]}].
+    """
+    unique = sorted({h.upper() for p in palettes for h in p['colors'].values()})
+    position = {h: i for i, h in enumerate(unique)}
+    luminance = relative_luminance_array(hex_array_to_rgb(unique))
+
+    groups = {}
+    for index, palette in enumerate(palettes):
+        groups.setdefault(tuple(palette['colors']), []).append(index)
+
+    results = [None] * len(palettes)
+    for roles, members in groups.items():
+        color_index = np.array([[position[palettes[m]['colors'][r].upper()] for r in roles]
+                                for m in members])
+        ratios = contrast_matrix(luminance[color_index])          # (P, R, R)
+        thresholds = required_pairs(roles, all_pairs, min_ratio)  # (R, R)
+        failing = (ratios < thresholds) & (thresholds > 0)
+        checked = int((thresholds > 0).sum())
+
+        for m in members:
+            results[m] = {
+                'name': palettes[m]['name'],
+                'source': palettes[m]['source'],
+                'checked': checked,
+                'failures': [],
+            }
+        # Only failing cells leave NumPy; order by (palette, ratio)
+        ks, ii, jj = np.nonzero(failing)
+        failed_ratios = np.round(ratios[ks, ii, jj], 2)
+        order = np.lexsort((failed_ratios, ks))
+        for k, i, j, ratio in zip(ks[order].tolist(), ii[order].tolist(), jj[order].tolist(),
+                                  failed_ratios[order].tolist()):
+            colors = palettes[members[k]]['colors']
+            results[members[k]]['failures'].append({
+                'foreground': roles[i],
+                'background': roles[j],
+                'foreground_hex': colors[roles[i]],
+                'background_hex': colors[roles[j]],
+                'ratio': ratio,
+                'required': float(thresholds[i, j]),
+            })
+    return results
+
+def run_audit(colors_csv, themes, all_pairs=False, min_ratio=None, as_json=False, show_passing=False):
+    palettes = load_colors_csv(colors_csv) if colors_csv else []
+    for theme in themes:
+        palettes.extend(load_theme_css(theme))
+
+    start = time.perf_counter()
+    results = audit_palettes(palettes, all_pairs=all_pairs, min_ratio=min_ratio)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    checked = sum(r['checked'] for r in results)
+    failed = sum(len(r['failures']) for r in results)
+    if as_json:
+        print(json.dumps({
+            'palettes': len(results),
+            'pairs_checked': checked,
+            'pairs_failed': failed,
+            'elapsed_ms': round(elapsed_ms, 3),
+            'results': results if show_passing else [r for r in results if r['failures']],
+        }, indent=2, ensure_ascii=False))
+        return failed
+
+    for r in results:
+        if not r['failures']:
+            if show_passing:
+                print(f"PASS  [{r['source']}] {r['name']} ({r['checked']} pairs)")
+            continue
+        print(f"FAIL  [{r['source']}] {r['name']} ({len(r['failures'])}/{r['checked']} pairs)")
+        for f in r['failures']:
+            print(f"      {f['foreground']} {f['foreground_hex']} on {f['background']} {f['background_hex']}: "
+                  f"{f['ratio']:.2f} < {f['required']:g}")
+    print(f"\n{len(results)} palettes, {checked} pairs checked, {failed} failing "
+          f"({elapsed_ms:.2f} ms)")
+    return failed
+
 def main():
     # Colors used when header is scrolled in CSS
     scrolled_bg = '#FAFAFA'   # --bg-primary default
@@ -52,4 +265,22 @@ def main():
         print('Result: FAIL - adjust colors')
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="WCAG contrast checker")
+    parser.add_argument("--audit", action="store_true", help="Audit every palette instead of the configured pair")
+    parser.add_argument("--colors", default=str(DEFAULT_COLORS_CSV), help="Palette CSV ('' to skip)")
+    parser.add_argument("--theme", action="append", help="Theme CSS file (repeatable, default static/css/*.css)")
+    parser.add_argument("--all-pairs", action="store_true", help="Check every pair, not just foreground/background")
+    parser.add_argument("--min-ratio", type=float, help="Override the required ratio for every checked pair")
+    parser.add_argument("--show-passing", action="store_true", help="Also list palettes with no failures")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--strict", action="store_true", help="Exit with status 1 when any pair fails")
+    args = parser.parse_args()
+
+    if not args.audit:
+        main()
+        sys.exit(0)
+
+    themes = args.theme if args.theme is not None else sorted(ROOT.glob(DEFAULT_THEME_GLOB))
+    failed = run_audit(args.colors, themes, all_pairs=args.all_pairs, min_ratio=args.min_ratio,
+                       as_json=args.json, show_passing=args.show_passing)
+    sys.exit(1 if args.strict and failed else 0)